@@ -1,6 +1,7 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, send_file
+from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, send_file, abort, Response
 from flask_session import Session
 from werkzeug.utils import secure_filename
+from werkzeug.middleware.proxy_fix import ProxyFix
 from datetime import datetime, timedelta
 import os
 import pandas as pd
@@ -8,7 +9,22 @@ from io import BytesIO
 import json
 
 # 로컬 모듈 import
-from models import db, Menu, Order, OrderItem, init_db, get_categories, get_menu_by_category, get_sales_data
+from models import db, Menu, Order, init_db, get_categories, get_menu_by_category, get_sales_data, get_sales_summary
+from stores import current_store, for_each_store, init_read_engines, read_only, reading
+from template_cache import init_template_cache
+from assets import init_assets
+from compression import init_compression
+from archive import init_archive, get_archived_orders, archived_order_dict
+from catalog import CATALOG_FORMATS, export_catalog, read_catalog, diff_catalog, apply_catalog
+from eta import init_eta, estimate_ready_time
+from maintenance import init_maintenance, database_stats, run_maintenance, backup_database
+from order_metrics import get_kitchen_metrics
+from pwa import init_pwa
+from serializers import init_serializers, order_dicts, TIMESTAMP_FORMATS
+from search import init_search, search_orders
+from order_queue import init_order_queue, order_payload, submit_order
+from rate_limit import init_rate_limit
+from receipts import init_receipts, render_receipts_html, render_receipts_text, render_receipts_pdf, pdf_available, RECEIPT_FORMATS
 import config
 
 app = Flask(__name__)
@@ -16,9 +32,28 @@ app = Flask(__name__)
 # 설정 로드
 app.config.from_object(config)
 
-# 확장 초기화
-Session(app)
-init_db(app)
+# 리버스 프록시 뒤에서는 X-Forwarded-For의 실제 클라이언트 IP 사용 (요청 속도 제한 등)
+if app.config['PROXY_FIX_HOPS']:
+    hops = app.config['PROXY_FIX_HOPS']
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops)
+
+# 확장 초기화 (영수증 프로세스 풀 워커가 spawn으로 이 파일을 __mp_main__으로 다시 읽을 때는 건너뜀)
+if __name__ != '__mp_main__':
+    Session(app)
+    init_rate_limit(app)
+    init_serializers(app)
+    init_db(app)
+    init_read_engines(app)
+    init_template_cache(app)
+    init_assets(app)
+    init_compression(app)
+    init_archive(app)
+    init_search(app)
+    init_receipts(app)
+    init_order_queue(app)
+    init_eta(app)
+    init_maintenance(app)
+    init_pwa(app)
 
 # 업로드 폴더 생성
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
@@ -46,6 +81,22 @@ def index():
     """메인 페이지 (사용자/관리자 선택)"""
     return render_template('index.html')
 
+@app.route('/store/<store_id>')
+def select_store(store_id):
+    """매장 선택"""
+    if store_id not in app.config['STORES']:
+        flash('존재하지 않는 매장입니다.', 'error')
+        return redirect(url_for('index'))
+    
+    # 장바구니는 매장별 메뉴를 참조하므로 매장이 바뀌면 비움
+    if session.get('store') != store_id:
+        session.pop('cart', None)
+    session['store'] = store_id
+    session.modified = True
+    
+    flash(f"{app.config['STORES'][store_id]['name']}(으)로 변경되었습니다.", 'success')
+    return redirect(request.referrer or url_for('user_menu'))
+
 @app.route('/init_db')
 def init_database():
     """데이터베이스 초기화"""
@@ -140,8 +191,9 @@ def view_cart():
     """장바구니 조회"""
     cart = session.get('cart', {})
     total_amount = sum(item['subtotal'] for item in cart.values())
+    eta = estimate_ready_time(cart) if cart else None
     
-    return render_template('user/cart.html', cart=cart, total_amount=total_amount)
+    return render_template('user/cart.html', cart=cart, total_amount=total_amount, eta=eta)
 
 @app.route('/user/update_cart', methods=['POST'])
 def update_cart():
@@ -185,40 +237,24 @@ def place_order():
             flash('고객명과 배달 장소는 필수입니다.', 'error')
             return redirect(url_for('view_cart'))
         
-        # 주문 생성
-        total_amount = sum(item['subtotal'] for item in cart.values())
-        
-        order = Order(
-            customer_name=customer_name,
-            delivery_location=delivery_location,
-            delivery_time=delivery_time,
-            order_request=order_request,
-            total_amount=total_amount,
-            status='pending'
-        )
-        
-        db.session.add(order)
-        db.session.flush()  # order.id를 얻기 위해
-        
-        # 주문 항목 생성
-        for cart_item in cart.values():
-            order_item = OrderItem(
-                order_id=order.id,
-                menu_id=cart_item['menu_id'],
-                quantity=cart_item['quantity'],
-                subtotal=cart_item['subtotal'],
-                temperature=cart_item['temperature'],
-                special_request=cart_item['special_request']
-            )
-            db.session.add(order_item)
+        # 시간대별 주문 수 제한을 넘으면 접수하지 않음
+        eta = estimate_ready_time(cart)
+        if eta['ready_at'] is None:
+            flash('주문이 많아 지금은 접수할 수 없습니다. 잠시 후 다시 주문해주세요.', 'error')
+            return redirect(url_for('view_cart'))
         
-        db.session.commit()
+        # 주문 저장 (그룹 커밋 시 쓰기 스레드가 커밋할 때까지 대기)
+        # 시간대 제한이 있으면 주문과 같은 트랜잭션에서 픽업 시간대를 예약하고 예상 시각을 그 시간대에 맞춤
+        payload = order_payload(cart, customer_name, delivery_location, delivery_time, order_request,
+                                ready_at=eta['earliest_at'])
+        order_id = submit_order(payload)
         
         # 장바구니 비우기
         session.pop('cart', None)
         session.modified = True
         
-        flash(f'주문이 완료되었습니다. 주문번호: {order.id}', 'success')
+        flash(f'주문이 완료되었습니다. 주문번호: {order_id} '
+              f'(예상 준비 완료: {payload["ready_at"].strftime("%H:%M")})', 'success')
         return redirect(url_for('user_menu'))
         
     except Exception as e:
@@ -265,6 +301,7 @@ def admin_logout():
 
 @app.route('/admin')
 @login_required
+@read_only
 def admin_dashboard():
     """관리자 대시보드"""
     # 오늘 매출 통계
@@ -281,12 +318,14 @@ def admin_dashboard():
     recent_orders = Order.query.order_by(Order.order_date.desc()).limit(10).all()
     
     return render_template('admin/dashboard.html',
+                         today=today,
                          today_sales=today_sales,
                          today_order_count=today_order_count,
                          recent_orders=recent_orders)
 
 @app.route('/admin/sales')
 @login_required
+@read_only
 def admin_sales():
     """매출 관리"""
     # 기본적으로 오늘부터 일주일 전까지의 데이터
@@ -302,6 +341,7 @@ def admin_sales():
 
 @app.route('/admin/sales/filter', methods=['POST'])
 @login_required
+@read_only
 def filter_sales():
     """매출 필터링"""
     try:
@@ -321,12 +361,70 @@ def filter_sales():
         flash(f'날짜 필터링 중 오류가 발생했습니다: {str(e)}', 'error')
         return redirect(url_for('admin_sales'))
 
+@app.route('/admin/stores/report', methods=['GET', 'POST'])
+@login_required
+@read_only
+def store_report():
+    """매장별 매출 통합 조회"""
+    try:
+        end_date = datetime.now().date()
+        start_date = end_date - timedelta(days=7)
+        
+        if request.method == 'POST':
+            start_date_str = request.form.get('start_date')
+            end_date_str = request.form.get('end_date')
+            start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date() if start_date_str else None
+            end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date() if end_date_str else None
+        
+        # 매장별로 병렬 조회 후 합산
+        store_sales = for_each_store(get_sales_summary, start_date, end_date)
+        total = {
+            'total_sales': sum(sales['total_sales'] for sales in store_sales.values()),
+            'total_orders': sum(sales['total_orders'] for sales in store_sales.values())
+        }
+        
+        return render_template('admin/store_report.html',
+                             store_sales=store_sales,
+                             total=total,
+                             start_date=start_date,
+                             end_date=end_date)
+    except Exception as e:
+        flash(f'매장별 매출 조회 중 오류가 발생했습니다: {str(e)}', 'error')
+        return redirect(url_for('admin_dashboard'))
+
+@app.route('/admin/kitchen', methods=['GET', 'POST'])
+@login_required
+@read_only
+def kitchen_metrics():
+    """주문 처리 시간 분석"""
+    try:
+        end_date = datetime.now().date()
+        start_date = end_date - timedelta(days=7)
+        
+        if request.method == 'POST':
+            start_date_str = request.form.get('start_date')
+            end_date_str = request.form.get('end_date')
+            start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date() if start_date_str else None
+            end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date() if end_date_str else None
+        
+        metrics = get_kitchen_metrics(start_date, end_date)
+        
+        return render_template('admin/kitchen_metrics.html',
+                             metrics=metrics,
+                             start_date=start_date,
+                             end_date=end_date)
+    except Exception as e:
+        flash(f'처리 시간 분석 중 오류가 발생했습니다: {str(e)}', 'error')
+        return redirect(url_for('admin_dashboard'))
+
 @app.route('/admin/export_all_orders')
 @login_required
+@read_only
 def export_all_orders():
     """전체 주문 내역 내보내기"""
     try:
         orders = Order.query.order_by(Order.order_date.desc()).all()
+        orders += get_archived_orders()
         
         # Excel 데이터 준비
         data = []
@@ -368,6 +466,7 @@ def export_all_orders():
 
 @app.route('/admin/export_period_orders', methods=['POST'])
 @login_required
+@read_only
 def export_period_orders():
     """기간별 주문 내역 내보내기"""
     try:
@@ -385,6 +484,7 @@ def export_period_orders():
             query = query.filter(Order.order_date <= end_date + timedelta(days=1))
         
         orders = query.all()
+        orders += get_archived_orders(start_date, end_date + timedelta(days=1) if end_date else None)
         
         # Excel 데이터 준비
         data = []
@@ -599,6 +699,64 @@ def update_menu_order():
         db.session.rollback()
         return jsonify({'success': False, 'message': str(e)})
 
+@app.route('/admin/menu/catalog', methods=['GET', 'POST'])
+@login_required
+def menu_catalog():
+    """메뉴 카탈로그 일괄 가져오기 (미리보기 후 적용)"""
+    if request.method == 'POST':
+        action = request.form.get('action', 'preview')
+        try:
+            if action == 'apply':
+                rows = session.pop('catalog_import', None)
+                if rows is None:
+                    flash('먼저 파일을 업로드해 변경 내용을 확인해주세요.', 'error')
+                    return redirect(url_for('menu_catalog'))
+
+                diff = apply_catalog(rows, soldout_missing=request.form.get('soldout_missing') == 'on')
+                flash(f'메뉴 카탈로그를 적용했습니다. (추가 {len(diff["added"])}개, 변경 {len(diff["changed"])}개)', 'success')
+                return redirect(url_for('admin_menu'))
+
+            file = request.files.get('file')
+            if not file or file.filename == '':
+                flash('파일이 선택되지 않았습니다.', 'error')
+                return redirect(url_for('menu_catalog'))
+
+            rows, errors = read_catalog(file)
+            if errors:
+                session.pop('catalog_import', None)
+                return render_template('admin/menu_catalog.html', errors=errors)
+
+            session['catalog_import'] = rows
+            return render_template('admin/menu_catalog.html', diff=diff_catalog(rows), filename=file.filename)
+
+        except Exception as e:
+            db.session.rollback()
+            flash(f'메뉴 카탈로그 처리 중 오류가 발생했습니다: {str(e)}', 'error')
+            return redirect(url_for('menu_catalog'))
+
+    return render_template('admin/menu_catalog.html')
+
+@app.route('/admin/menu/catalog/export')
+@login_required
+@read_only
+def export_menu_catalog():
+    """메뉴 카탈로그 내보내기"""
+    output_format = request.args.get('format', 'xlsx')
+    if output_format not in CATALOG_FORMATS:
+        abort(400)
+
+    try:
+        output, mimetype, extension = export_catalog(output_format)
+        return send_file(
+            output,
+            as_attachment=True,
+            download_name=f'메뉴_카탈로그_{datetime.now().strftime("%Y%m%d")}{extension}',
+            mimetype=mimetype
+        )
+    except Exception as e:
+        flash(f'내보내기 중 오류가 발생했습니다: {str(e)}', 'error')
+        return redirect(url_for('menu_catalog'))
+
 # ============================================================================
 # 카테고리 관리 라우트
 # ============================================================================
@@ -634,12 +792,13 @@ def admin_categories():
             db.session.rollback()
             flash(f'카테고리 추가 중 오류가 발생했습니다: {str(e)}', 'error')
     
-    categories = get_categories()
-    # 각 카테고리별 메뉴 수 계산
-    category_counts = {}
-    for category in categories:
-        count = Menu.query.filter_by(category=category).count()
-        category_counts[category] = count
+    with reading():
+        categories = get_categories()
+        # 각 카테고리별 메뉴 수 계산
+        category_counts = {}
+        for category in categories:
+            count = Menu.query.filter_by(category=category).count()
+            category_counts[category] = count
     
     return render_template('admin/categories.html', 
                          categories=categories, 
@@ -717,24 +876,135 @@ def import_orders():
     
     return render_template('admin/import_orders.html')
 
+@app.route('/admin/orders/search')
+@login_required
+@read_only
+def admin_search_orders():
+    """주문 검색"""
+    keyword = request.args.get('q', '').strip()
+    page = request.args.get('page', 1, type=int)
+    results = search_orders(keyword, page, app.config['ITEMS_PER_PAGE'])
+    
+    return render_template('admin/search_orders.html', keyword=keyword, results=results)
+
+@app.route('/admin/search_orders')
+@login_required
+@read_only
+def search_orders_api():
+    """주문 검색 (AJAX)"""
+    try:
+        keyword = request.args.get('q', '').strip()
+        page = request.args.get('page', 1, type=int)
+        per_page = max(1, min(request.args.get('per_page', app.config['ITEMS_PER_PAGE'], type=int), 100))
+        results = search_orders(keyword, page, per_page)
+        
+        return jsonify({
+            'success': True,
+            'orders': [archived_order_dict(order) if getattr(order, 'archived', False) else order.to_dict()
+                       for order in results['orders']],
+            'total': results['total'],
+            'page': results['page'],
+            'pages': results['pages']
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)})
+
 @app.route('/admin/print_receipt/<int:order_id>')
 @login_required
 def print_receipt(order_id):
     """영수증 출력"""
-    order = Order.query.get_or_404(order_id)
-    return render_template('admin/receipt.html', order=order)
+    receipts = render_receipts_html([order_id])
+    if not receipts:
+        abort(404)
+    return render_template('admin/receipt.html', receipts=receipts, order_ids=[order_id])
+
+@app.route('/admin/print_receipts')
+@login_required
+def print_receipts():
+    """영수증 일괄 출력 (ids=1,2,3 또는 date=YYYY-MM-DD, format=html|text|pdf)"""
+    try:
+        output_format = request.args.get('format', 'html')
+        if output_format not in RECEIPT_FORMATS:
+            flash('지원하지 않는 출력 형식입니다.', 'error')
+            return redirect(url_for('admin_dashboard'))
+        
+        order_ids = [int(value) for value in request.args.get('ids', '').split(',') if value.strip().isdigit()]
+        
+        date_str = request.args.get('date')
+        if date_str:
+            day = datetime.strptime(date_str, '%Y-%m-%d')
+            day_orders = db.session.query(Order.id).filter(
+                Order.order_date >= day,
+                Order.order_date < day + timedelta(days=1)
+            ).order_by(Order.id.asc()).all()
+            order_ids += [order_id for (order_id,) in day_orders]
+        
+        order_ids = order_ids[:app.config['RECEIPT_BATCH_LIMIT']]
+        if not order_ids:
+            flash('출력할 주문이 없습니다.', 'error')
+            return redirect(url_for('admin_dashboard'))
+        
+        if output_format == 'text':
+            return Response(render_receipts_text(order_ids), mimetype='text/plain')
+        
+        if output_format == 'pdf':
+            if not pdf_available():
+                flash('PDF 출력을 사용하려면 reportlab 패키지를 설치해주세요.', 'error')
+                return redirect(url_for('admin_dashboard'))
+            return send_file(
+                BytesIO(render_receipts_pdf(order_ids)),
+                download_name=f'영수증_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf',
+                mimetype='application/pdf'
+            )
+        
+        receipts = render_receipts_html(order_ids)
+        return render_template('admin/receipt.html', receipts=receipts, order_ids=order_ids)
+        
+    except Exception as e:
+        flash(f'영수증 출력 중 오류가 발생했습니다: {str(e)}', 'error')
+        return redirect(url_for('admin_dashboard'))
 
 @app.route('/admin/get_recent_orders')
 @login_required
+@read_only
 def get_recent_orders():
-    """최근 주문 조회 (AJAX)"""
+    """최근 주문 조회 (AJAX, fields=id,status,items.menu_name / timestamps=iso|epoch)"""
     try:
-        orders = Order.query.order_by(Order.order_date.desc()).limit(20).all()
-        orders_data = [order.to_dict() for order in orders]
+        timestamps = request.args.get('timestamps', 'iso')
+        if timestamps not in TIMESTAMP_FORMATS:
+            timestamps = 'iso'
+        orders_data = order_dicts(limit=20, fields=request.args.get('fields'), timestamps=timestamps)
         return jsonify({'success': True, 'orders': orders_data})
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)})
 
+@app.route('/admin/rate_limit_stats')
+@login_required
+def rate_limit_stats():
+    """요청 속도 제한 현황 (AJAX)"""
+    limiter = app.extensions.get('rate_limiter')
+    if limiter is None:
+        return jsonify({'success': False, 'message': '요청 속도 제한이 꺼져 있습니다.'})
+    return jsonify({'success': True, **limiter.stats()})
+
+@app.route('/admin/maintenance', methods=['GET', 'POST'])
+@login_required
+def admin_maintenance():
+    """데이터베이스 유지보수 현황 및 수동 실행"""
+    if request.method == 'POST':
+        try:
+            if request.form.get('action') == 'backup':
+                backup_database()
+                flash('데이터베이스 백업이 완료되었습니다.', 'success')
+            else:
+                result = run_maintenance()
+                flash(f'데이터베이스 정리가 완료되었습니다. ({result["seconds"]}초)', 'success')
+        except Exception as e:
+            flash(f'데이터베이스 유지보수 중 오류가 발생했습니다: {str(e)}', 'error')
+        return redirect(url_for('admin_maintenance'))
+    
+    return render_template('admin/maintenance.html', stats=database_stats())
+
 @app.route('/admin/update_order_status/<int:order_id>', methods=['POST'])
 @login_required
 def update_order_status(order_id):
@@ -796,6 +1066,8 @@ def inject_globals():
     return {
         'cart_count': cart_count,
         'admin_logged_in': session.get('admin_logged_in', False),
+        'stores': app.config['STORES'],
+        'current_store': current_store(),
         'current_year': datetime.now().year
     }
 
@@ -0,0 +1,215 @@
+"""오래된 주문을 월별 보관 데이터베이스로 이동
+
+완료/취소된 주문 중 ARCHIVE_AFTER_DAYS가 지난 주문은 instance/archive/orders_YYYYMM.db로
+옮겨 운영 테이블(cafe_order, cafe_order_item)을 작게 유지합니다. 보관된 주문은 조회 시
+해당 월 파일만 ATTACH하여 읽습니다.
+"""
+from flask import current_app
+from sqlalchemy import MetaData, create_engine, select, insert, delete, func
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+import os
+import re
+
+from models import db, Menu, Order, OrderItem
+from stores import current_engine, current_store, use_store
+
+ARCHIVE_SCHEMA = 'archive'
+ARCHIVE_FILE_PATTERN = re.compile(r'^orders_(\d{6})\.db$')
+
+# ATTACH된 보관 데이터베이스를 가리키는 테이블
+_archive_metadata = MetaData()
+archive_order = Order.__table__.to_metadata(_archive_metadata, schema=ARCHIVE_SCHEMA)
+archive_item = OrderItem.__table__.to_metadata(_archive_metadata, schema=ARCHIVE_SCHEMA)
+
+
+def archive_enabled():
+    """SQLite에서만 보관 기능 사용"""
+    return current_engine().dialect.name == 'sqlite'
+
+
+def archive_folder():
+    """현재 매장의 보관 파일 폴더 (상대 경로는 instance 폴더 기준, 기본 매장 외에는 매장별 하위 폴더)"""
+    folder = os.path.join(current_app.instance_path, current_app.config['ARCHIVE_FOLDER'])
+    if current_store() != current_app.config['DEFAULT_STORE']:
+        folder = os.path.join(folder, current_store())
+    os.makedirs(folder, exist_ok=True)
+    return folder
+
+
+def archive_path(month):
+    return os.path.join(archive_folder(), f'orders_{month}.db')
+
+
+def archive_months():
+    """보관 파일이 있는 월 목록 (YYYYMM, 오름차순)"""
+    months = []
+    for filename in os.listdir(archive_folder()):
+        match = ARCHIVE_FILE_PATTERN.match(filename)
+        if match:
+            months.append(match.group(1))
+    return sorted(months)
+
+
+def _month_range(month):
+    """월의 시작일과 다음 달 시작일"""
+    start = date(int(month[:4]), int(month[4:]), 1)
+    end = date(start.year + start.month // 12, start.month % 12 + 1, 1)
+    return start, end
+
+
+def _to_date(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+def months_between(start_date=None, end_date=None):
+    """조회 기간과 겹치는 보관 월 목록"""
+    start_date, end_date = _to_date(start_date), _to_date(end_date)
+    months = []
+    for month in archive_months():
+        month_start, next_month = _month_range(month)
+        if end_date and month_start > end_date:
+            continue
+        if start_date and next_month <= start_date:
+            continue
+        months.append(month)
+    return months
+
+
+def _ensure_archive_schema(path):
+    """보관 파일에 주문 테이블 생성"""
+    engine = create_engine(f'sqlite:///{path}')
+    try:
+        Order.__table__.create(engine, checkfirst=True)
+        OrderItem.__table__.create(engine, checkfirst=True)
+    finally:
+        engine.dispose()
+
+
+@contextmanager
+def attached(month):
+    """보관 파일을 ATTACH한 연결 반환"""
+    with current_engine().connect() as conn:
+        conn.exec_driver_sql(f'ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}', (archive_path(month),))
+        try:
+            yield conn
+        finally:
+            conn.rollback()
+            conn.exec_driver_sql(f'DETACH DATABASE {ARCHIVE_SCHEMA}')
+
+
+def archive_orders(before=None):
+    """기준일 이전의 완료/취소 주문을 월별 보관 파일로 이동하고 이동한 주문 수 반환"""
+    if not archive_enabled():
+        return 0
+
+    config = current_app.config
+    if before is None:
+        before = datetime.now() - timedelta(days=config['ARCHIVE_AFTER_DAYS'])
+
+    # 가장 최근 주문은 남겨 두어 주문번호(rowid)가 재사용되지 않도록 함
+    max_id = db.session.query(func.max(Order.id)).scalar() or 0
+    eligible = [
+        Order.order_date < before,
+        Order.status.in_(config['ARCHIVE_STATUSES']),
+        Order.id < max_id,
+    ]
+
+    months = db.session.query(func.strftime('%Y%m', Order.order_date)).filter(*eligible).distinct().all()
+    db.session.close()  # 읽기 트랜잭션 종료 (보관 연결의 쓰기 잠금과 충돌 방지)
+
+    moved = 0
+    for (month,) in months:
+        month_start, next_month = _month_range(month)
+        _ensure_archive_schema(archive_path(month))
+
+        order_ids = select(Order.id).where(
+            *eligible,
+            Order.order_date >= month_start,
+            Order.order_date < next_month
+        )
+
+        with attached(month) as conn:
+            conn.execute(insert(archive_order).from_select(
+                list(Order.__table__.c.keys()),
+                select(*Order.__table__.c).where(Order.id.in_(order_ids))
+            ))
+            conn.execute(insert(archive_item).from_select(
+                list(OrderItem.__table__.c.keys()),
+                select(*OrderItem.__table__.c).where(OrderItem.order_id.in_(order_ids))
+            ))
+            conn.execute(delete(OrderItem.__table__).where(OrderItem.order_id.in_(order_ids)))
+            moved += conn.execute(delete(Order.__table__).where(Order.id.in_(order_ids))).rowcount
+            # 삭제 트리거가 지운 검색 색인을 보관 파일의 주문으로 다시 추가 (순환 import 방지를 위해 함수 내에서 import)
+            from search import index_archived_orders, search_enabled
+            if search_enabled():
+                index_archived_orders(conn)
+            conn.commit()
+
+    return moved
+
+
+def get_archived_orders(start_date=None, end_date=None, statuses=None, order_ids=None):
+    """보관된 주문 조회 (Order와 같은 속성을 가진 읽기 전용 객체, 최신순)"""
+    if not archive_enabled():
+        return []
+
+    conditions = []
+    if start_date:
+        conditions.append(archive_order.c.order_date >= start_date)
+    if end_date:
+        conditions.append(archive_order.c.order_date <= end_date)
+    if statuses:
+        conditions.append(archive_order.c.status.in_(statuses))
+    if order_ids is not None:
+        conditions.append(archive_order.c.id.in_(order_ids))
+
+    menu = Menu.__table__
+    orders = []
+    for month in reversed(months_between(start_date, end_date)):
+        with attached(month) as conn:
+            rows = conn.execute(
+                select(archive_order).where(*conditions).order_by(archive_order.c.order_date.desc())
+            ).mappings().all()
+            item_rows = conn.execute(
+                select(archive_item, menu.c.name.label('menu_name'))
+                .outerjoin(menu, menu.c.id == archive_item.c.menu_id)
+                .where(archive_item.c.order_id.in_(select(archive_order.c.id).where(*conditions)))
+                .order_by(archive_item.c.id)
+            ).mappings().all()
+
+        items_by_order = {}
+        for row in item_rows:
+            item = dict(row)
+            item['menu'] = SimpleNamespace(name=item.pop('menu_name'))
+            items_by_order.setdefault(item['order_id'], []).append(SimpleNamespace(**item))
+
+        for row in rows:
+            orders.append(SimpleNamespace(
+                **row,
+                order_items=items_by_order.get(row['id'], []),
+                archived=True
+            ))
+
+    return orders
+
+
+def archived_order_dict(order):
+    """보관된 주문을 Order.to_dict()와 같은 형식으로 변환"""
+    data = Order.to_dict(SimpleNamespace(**{**vars(order), 'order_items': []}))
+    data['items'] = [OrderItem.to_dict(item) for item in order.order_items]
+    data['archived'] = True
+    return data
+
+
+def init_archive(app):
+    """주문 보관 명령 등록"""
+
+    @app.cli.command('archive-orders')
+    def archive_orders_command():
+        """오래된 주문을 월별 보관 파일로 이동 (모든 매장)"""
+        for store_id in app.config['STORES']:
+            with use_store(store_id):
+                moved = archive_orders()
+            print(f'[{store_id}] {moved}개의 주문이 보관되었습니다.')
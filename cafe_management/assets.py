@@ -0,0 +1,162 @@
+"""정적 파일 빌드 (압축, 해시 파일명, 사전 압축본 생성)
+
+사용법:
+    python assets.py
+"""
+from flask import current_app, request, send_from_directory, url_for, abort
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+
+try:
+    import brotli
+except ImportError:  # brotli 미설치 시 .br 파일은 생성하지 않음
+    brotli = None
+
+try:
+    import rcssmin
+except ImportError:
+    rcssmin = None
+
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
+# 빌드 대상 파일 (static 폴더 기준)
+ASSET_SOURCES = [
+    'css/style.css',
+    'js/main.js',
+    'js/pwa.js',
+]
+
+ASSET_DIST_DIR = 'dist'
+ASSET_MANIFEST = 'manifest.json'
+
+# 사전 압축본 (Accept-Encoding 값, 확장자) - 선호 순서
+PRECOMPRESSED = [('br', '.br'), ('gzip', '.gz')]
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def minify_css(source):
+    """CSS 압축 (rcssmin 설치 시 사용)"""
+    if rcssmin is not None:
+        return rcssmin.cssmin(source)
+    source = re.sub(r'/\*.*?\*/', '', source, flags=re.S)
+    source = re.sub(r'\s+', ' ', source)
+    source = re.sub(r'\s*([{};,>])\s*', r'\1', source)
+    return source.replace(';}', '}').strip()
+
+
+def minify_js(source):
+    """JavaScript 압축 (rjsmin 설치 시 사용, 미설치 시 주석 줄/들여쓰기만 제거)"""
+    if rjsmin is not None:
+        return rjsmin.jsmin(source)
+    lines = []
+    for line in source.splitlines():
+        line = line.strip()
+        if line and not line.startswith('//'):
+            lines.append(line)
+    return '\n'.join(lines)
+
+
+MINIFIERS = {
+    '.css': minify_css,
+    '.js': minify_js,
+}
+
+
+def build_assets(static_folder, sources=ASSET_SOURCES):
+    """정적 파일을 압축/해시하여 dist 폴더에 저장하고 매니페스트 반환"""
+    dist_folder = os.path.join(static_folder, ASSET_DIST_DIR)
+    manifest = {}
+
+    for source in sources:
+        with open(os.path.join(static_folder, source), encoding='utf-8') as f:
+            content = f.read()
+
+        base, ext = os.path.splitext(source)
+        minify = MINIFIERS.get(ext)
+        data = (minify(content) if minify else content).encode('utf-8')
+
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        hashed_name = f'{base}.{digest}{ext}'
+        target = os.path.join(dist_folder, hashed_name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+
+        with open(target, 'wb') as f:
+            f.write(data)
+        with open(target + '.gz', 'wb') as f:
+            f.write(gzip.compress(data, compresslevel=9, mtime=0))
+        if brotli is not None:
+            with open(target + '.br', 'wb') as f:
+                f.write(brotli.compress(data, quality=11))
+
+        manifest[source] = hashed_name
+
+    with open(os.path.join(dist_folder, ASSET_MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    return manifest
+
+
+def load_manifest(static_folder):
+    """빌드 매니페스트 로드 (빌드 전이면 빈 딕셔너리)"""
+    path = os.path.join(static_folder, ASSET_DIST_DIR, ASSET_MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def asset_url(filename):
+    """해시 파일명 URL 반환 (빌드되지 않은 파일은 일반 static URL)"""
+    hashed_name = current_app.extensions['asset_manifest'].get(filename)
+    if hashed_name is None:
+        return url_for('static', filename=filename)
+    return url_for('hashed_asset', filename=hashed_name)
+
+
+def serve_hashed_asset(filename):
+    """해시 파일 제공 (사전 압축본 우선, 영구 캐시)"""
+    dist_folder = os.path.join(current_app.static_folder, ASSET_DIST_DIR)
+    if not os.path.isfile(os.path.join(dist_folder, filename)):
+        abort(404)
+
+    accepted = request.accept_encodings
+    for encoding, suffix in PRECOMPRESSED:
+        if accepted[encoding] and os.path.isfile(os.path.join(dist_folder, filename + suffix)):
+            response = send_from_directory(dist_folder, filename + suffix,
+                                           mimetype=mimetypes.guess_type(filename)[0])
+            response.headers['Content-Encoding'] = encoding
+            break
+    else:
+        response = send_from_directory(dist_folder, filename)
+
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def init_assets(app):
+    """해시 정적 파일 라우트 및 템플릿 헬퍼 등록"""
+    app.extensions['asset_manifest'] = load_manifest(app.static_folder)
+    app.add_url_rule('/assets/<path:filename>', 'hashed_asset', serve_hashed_asset)
+    app.jinja_env.globals['asset_url'] = asset_url
+
+    @app.cli.command('build-assets')
+    def build_assets_command():
+        """정적 파일 빌드"""
+        app.extensions['asset_manifest'] = build_assets(app.static_folder)
+        print(f"{len(app.extensions['asset_manifest'])}개 파일이 빌드되었습니다.")
+
+
+if __name__ == '__main__':
+    static_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+    manifest = build_assets(static_folder)
+    for source, hashed_name in manifest.items():
+        print(f'{source} -> {ASSET_DIST_DIR}/{hashed_name}')
@@ -0,0 +1,356 @@
+"""성능 측정 스크립트
+
+사용법:
+    python benchmark.py              # 전체 측정
+    python benchmark.py templates    # 템플릿 렌더링만 측정
+    python benchmark.py compression  # 응답 압축 크기/CPU 비용 측정
+    python benchmark.py read_write   # 내보내기 실행 중 주문 지연 시간 측정
+    python benchmark.py order_intake # 동시 주문 처리량 측정 (그룹 커밋 비교)
+    python benchmark.py serialization # 주문 JSON 생성 시간 측정 (to_dict 비교)
+    python benchmark.py catalog      # 메뉴 일괄 등록 시간 측정 (개별 추가 비교)
+    python benchmark.py offline_menu # 메뉴 화면 재방문 비용 측정 (화면 전체 / 버전 확인 304)
+"""
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+# 실제 데이터베이스 대신 임시 데이터베이스 사용
+BENCH_DIR = tempfile.mkdtemp(prefix='cafe_bench_')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(BENCH_DIR, 'bench.db')
+
+from app import app
+from models import db, Menu, Order, OrderItem
+from compression import compress_body, brotli
+from serializers import order_dicts, orjson
+from catalog import apply_catalog
+from stores import current_engine
+
+# 측정 중에는 요청 속도 제한을 적용하지 않음
+if 'rate_limiter' in app.extensions:
+    app.extensions['rate_limiter'].limits = {}
+
+SEED_ORDERS = 500
+
+# 내보내기 중 주문 p95가 유휴 상태 대비 넘지 않아야 하는 배수 (읽기 엔진 사용 시)
+READ_WRITE_P95_LIMIT = 3
+
+# 측정 대상 템플릿 (템플릿, URL)
+TEMPLATE_PAGES = [
+    ('user/menu.html', '/user/menu'),
+    ('admin/dashboard.html', '/admin'),
+    ('admin/sales.html', '/admin/sales'),
+]
+
+
+def seed_orders(count=SEED_ORDERS):
+    """측정용 주문 데이터 생성"""
+    with app.app_context():
+        menus = Menu.query.all()
+        for i in range(count):
+            menu = random.choice(menus)
+            quantity = random.randint(1, 3)
+            order = Order(
+                order_date=datetime.now() - timedelta(days=random.randint(1, 6), minutes=random.randint(0, 600)),
+                customer_name=f'고객{i}',
+                delivery_location=f'{random.randint(1, 12)}층',
+                total_amount=int(menu.price * quantity),
+                status=random.choice(['pending', 'preparing', 'ready', 'completed'])
+            )
+            order.order_items.append(OrderItem(menu_id=menu.id, quantity=quantity,
+                                               subtotal=menu.price * quantity))
+            db.session.add(order)
+        db.session.commit()
+
+
+def admin_client():
+    """관리자로 로그인된 테스트 클라이언트"""
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['admin_logged_in'] = True
+    return client
+
+
+def timed(func, repeat):
+    """func를 repeat회 실행한 평균 시간 (ms)"""
+    func()  # 워밍업
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def bench_templates(repeat=200):
+    """템플릿 조각 캐시 및 바이트코드 캐시 효과 측정"""
+    print('== 템플릿 렌더링 ==')
+    client = admin_client()
+    env = app.jinja_env
+    fragment_cache = env.fragment_cache
+    bytecode_cache = env.bytecode_cache
+
+    print(f'{"template":<24}{"no cache":>12}{"fragment":>12}{"speedup":>10}')
+    for template, url in TEMPLATE_PAGES:
+        env.fragment_cache = None
+        plain = timed(lambda: client.get(url), repeat)
+        env.fragment_cache = fragment_cache
+        cached = timed(lambda: client.get(url), repeat)
+        print(f'{template:<24}{plain:>10.2f}ms{cached:>10.2f}ms{plain / cached:>9.2f}x')
+
+    # 워커 시작 시 템플릿 컴파일 비용
+    def compile_all():
+        env.cache.clear()
+        for template, _ in TEMPLATE_PAGES:
+            env.get_template(template)
+
+    env.bytecode_cache = None
+    plain = timed(compile_all, 20)
+    env.bytecode_cache = bytecode_cache
+    cached = timed(compile_all, 20)
+    print(f'{"compile (all)":<24}{plain:>10.2f}ms{cached:>10.2f}ms{plain / cached:>9.2f}x')
+
+
+# 압축 측정 대상 엔드포인트
+COMPRESSION_ENDPOINTS = [
+    '/user/menu',
+    '/admin',
+    '/admin/sales',
+    '/admin/get_recent_orders',
+]
+
+
+def bench_compression(repeat=50):
+    """엔드포인트별 전송 크기 및 압축 CPU 비용 측정"""
+    print('== 응답 압축 ==')
+    client = admin_client()
+    encodings = ['gzip'] + (['br'] if brotli is not None else [])
+
+    header = f'{"endpoint":<28}{"identity":>10}'
+    for encoding in encodings:
+        header += f'{encoding:>10}{encoding + " cpu":>12}'
+    print(header)
+
+    for url in COMPRESSION_ENDPOINTS:
+        body = client.get(url, headers={'Accept-Encoding': 'identity'}).get_data()
+        line = f'{url:<28}{len(body):>9}B'
+        for encoding in encodings:
+            size = len(client.get(url, headers={'Accept-Encoding': encoding}).get_data())
+            cpu = timed(lambda: compress_body(body, encoding, app.config), repeat)
+            line += f'{size:>9}B{cpu:>10.3f}ms'
+        print(line)
+
+
+def order_latencies(count):
+    """장바구니에 담은 뒤 주문하기까지의 주문 요청 지연 시간 목록 (ms)"""
+    client = app.test_client()
+    with app.app_context():
+        menu_ids = [menu.id for menu in Menu.query.filter_by(is_soldout=False)]
+
+    latencies = []
+    for i in range(count):
+        client.post('/user/add_to_cart', data={'menu_id': random.choice(menu_ids), 'quantity': 1})
+        start = time.perf_counter()
+        client.post('/user/place_order', data={'customer_name': f'측정{i}', 'delivery_location': '1층'})
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def latency_summary(latencies):
+    cuts = statistics.quantiles(latencies, n=20)
+    return f'{statistics.median(latencies):>8.2f}ms{cuts[-1]:>8.2f}ms{max(latencies):>8.2f}ms'
+
+
+# 다른 워커 프로세스에서 전체 주문 내보내기를 반복 (인자: 저널 모드, 읽기 엔진 사용 여부 read/single)
+EXPORT_WORKER = """
+import sys
+from app import app
+from stores import current_engine
+
+journal_mode, engines = sys.argv[1:]
+if 'rate_limiter' in app.extensions:
+    app.extensions['rate_limiter'].limits = {}
+with app.app_context():
+    for read_engine in app.extensions['read_engines'].values():
+        read_engine.dispose()
+    current_engine().dispose()
+    with current_engine().connect() as conn:
+        conn.exec_driver_sql(f'PRAGMA journal_mode = {journal_mode}')
+if engines == 'single':
+    app.extensions['read_engines'] = {}
+
+client = app.test_client()
+with client.session_transaction() as sess:
+    sess['admin_logged_in'] = True
+print('ready', flush=True)
+while True:
+    client.get('/admin/export_all_orders')
+    print('export', flush=True)
+"""
+
+
+def bench_read_write(orders=100, min_exports=3):
+    """다른 워커가 전체 주문 내보내기를 계속 실행하는 동안의 주문 지연 시간 측정
+
+    내보내기는 별도 프로세스에서 쉬지 않고 반복하고, 주문 orders건과 내보내기 min_exports회가 모두 끝날
+    때까지 주문하므로 측정하는 동안 항상 내보내기가 실행 중입니다. 기준은 WAL을 끈 단일 엔진(롤백 저널)이며,
+    WAL과 읽기 엔진을 사용하면 주문 p95가 유휴 상태의 READ_WRITE_P95_LIMIT배 이내인지 확인합니다.
+    """
+    print('== 읽기/쓰기 분리 ==')
+
+    def during_export(journal_mode, engines):
+        # 저널 모드를 바꿀 수 있도록 이 프로세스의 연결을 모두 닫음
+        with app.app_context():
+            current_engine().dispose()
+            for read_engine in app.extensions['read_engines'].values():
+                read_engine.dispose()
+
+        worker = subprocess.Popen([sys.executable, '-c', EXPORT_WORKER, journal_mode, engines],
+                                  cwd=os.path.dirname(os.path.abspath(__file__)),
+                                  stdout=subprocess.PIPE, text=True)
+        exports = []
+        try:
+            worker.stdout.readline()  # ready
+            threading.Thread(target=lambda: exports.extend(worker.stdout), daemon=True).start()
+            latencies = []
+            while len(latencies) < orders or len(exports) < min_exports:
+                latencies += order_latencies(10)
+            return latencies, len(exports)
+        finally:
+            worker.kill()
+            worker.wait()
+
+    def p95(latencies):
+        return statistics.quantiles(latencies, n=20)[-1]
+
+    idle = order_latencies(orders)
+    print(f'{"case":<28}{"p50":>10}{"p95":>10}{"max":>10}{"exports":>9}{"p95/idle":>10}')
+    print(f'{"idle":<28}{latency_summary(idle)}{"":>9}{1:>9.2f}x')
+
+    cases = [
+        ('export (rollback journal)', 'DELETE', 'single'),
+        ('export (WAL, single engine)', 'WAL', 'single'),
+        ('export (WAL, read engine)', 'WAL', 'read'),
+    ]
+    for name, journal_mode, engines in cases:
+        latencies, exports = during_export(journal_mode, engines)
+        print(f'{name:<28}{latency_summary(latencies)}{exports:>9}{p95(latencies) / p95(idle):>9.2f}x')
+
+    limit = p95(idle) * READ_WRITE_P95_LIMIT
+    assert p95(latencies) <= limit, \
+        f'읽기 엔진 사용 시 주문 p95 {p95(latencies):.2f}ms가 허용치 {limit:.2f}ms를 넘었습니다.'
+
+
+def bench_order_intake(clients=16, orders=30):
+    """동시 고객 clients명이 각각 orders건씩 주문할 때의 처리량 (주문/초)"""
+    print('== 주문 접수 ==')
+    with app.app_context():
+        menu_ids = [menu.id for menu in Menu.query.filter_by(is_soldout=False)]
+
+    def customer(n):
+        client = app.test_client()
+        for i in range(orders):
+            client.post('/user/add_to_cart', data={'menu_id': random.choice(menu_ids), 'quantity': 1})
+            client.post('/user/place_order', data={'customer_name': f'고객{n}-{i}', 'delivery_location': '1층'})
+
+    def throughput():
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as executor:
+            list(executor.map(customer, range(clients)))
+        return clients * orders / (time.perf_counter() - start)
+
+    group_commit = app.config['ORDER_GROUP_COMMIT']
+    print(f'{"mode":<28}{"orders/sec":>12}')
+    for label, enabled in [('commit per order', False), ('group commit', True)]:
+        app.config['ORDER_GROUP_COMMIT'] = enabled
+        print(f'{label:<28}{throughput():>12.1f}')
+    app.config['ORDER_GROUP_COMMIT'] = group_commit
+
+
+# 대시보드 새로고침에서 사용하는 필드
+DASHBOARD_FIELDS = 'id,customer_name,delivery_location,total_amount,status,order_date'
+
+
+def bench_serialization(repeat=50):
+    """최근 주문 JSON 생성 시간: ORM + to_dict + json 대비 Core 쿼리 + FastJSONProvider"""
+    print('== JSON 직렬화 ==')
+    print(f'orjson: {"사용" if orjson is not None else "미설치 (표준 json)"}')
+
+    def to_dict_path(limit):
+        orders = Order.query.order_by(Order.order_date.desc()).limit(limit).all()
+        return json.dumps([order.to_dict() for order in orders], ensure_ascii=False)
+
+    print(f'{"orders":<10}{"to_dict":>12}{"core":>12}{"core+fields":>14}{"epoch":>12}{"speedup":>10}')
+    with app.test_request_context():
+        for limit in (20, 200, SEED_ORDERS):
+            plain = timed(lambda: to_dict_path(limit), repeat)
+            core = timed(lambda: app.json.dumps(order_dicts(limit=limit)), repeat)
+            sparse = timed(lambda: app.json.dumps(order_dicts(limit=limit, fields=DASHBOARD_FIELDS)), repeat)
+            epoch = timed(lambda: app.json.dumps(order_dicts(limit=limit, timestamps='epoch')), repeat)
+            print(f'{limit:<10}{plain:>10.2f}ms{core:>10.2f}ms{sparse:>12.2f}ms{epoch:>10.2f}ms{plain / core:>9.2f}x')
+
+
+def bench_catalog(menus=100):
+    """메뉴 일괄 등록: 메뉴마다 순서 조회 + 커밋 대비 카탈로그 가져오기 (추가 후 같은 메뉴 가격 변경)"""
+    print('== 메뉴 카탈로그 ==')
+    print(f'{"menus":<10}{"add_menu":>12}{"catalog":>12}{"update":>12}{"speedup":>10}')
+    with app.app_context():
+        rows = [{'name': f'개별{i}', 'category': '측정', 'price': 4000} for i in range(menus)]
+        start = time.perf_counter()
+        for row in rows:
+            max_order = db.session.query(db.func.max(Menu.display_order)).scalar() or 0
+            db.session.add(Menu(display_order=max_order + 1, **row))
+            db.session.commit()
+        single = (time.perf_counter() - start) * 1000
+
+        rows = [{'name': f'일괄{i}', 'category': '측정', 'price': 4000} for i in range(menus)]
+        start = time.perf_counter()
+        apply_catalog(rows)
+        catalog = (time.perf_counter() - start) * 1000
+
+        for row in rows:
+            row['price'] = 4500
+        start = time.perf_counter()
+        apply_catalog(rows)
+        update = (time.perf_counter() - start) * 1000
+    print(f'{menus:<10}{single:>10.1f}ms{catalog:>10.1f}ms{update:>10.1f}ms{single / catalog:>9.1f}x')
+
+
+def bench_offline_menu(repeat=200):
+    """메뉴 화면 재방문: 화면 전체를 받는 경우 대비 서비스 워커의 메뉴 JSON 버전 확인(304)"""
+    print('== 메뉴 화면 재방문 ==')
+    client = app.test_client()
+    page = client.get('/user/menu')
+    version = page.headers['X-Menu-Version']
+    headers = {'If-None-Match': f'"{version}"', 'Accept-Encoding': 'gzip'}
+
+    full = timed(lambda: client.get('/user/menu', headers={'Accept-Encoding': 'gzip'}), repeat)
+    revalidate = timed(lambda: client.get('/user/menu.json', headers=headers), repeat)
+    page_bytes = len(client.get('/user/menu', headers={'Accept-Encoding': 'gzip'}).data)
+    print(f'{"":<14}{"time":>10}{"bytes":>10}')
+    print(f'{"page":<14}{full:>8.2f}ms{page_bytes:>10}')
+    print(f'{"menu.json 304":<14}{revalidate:>8.2f}ms{len(client.get("/user/menu.json", headers=headers).data):>10}')
+    print(f'speedup: {full / revalidate:.1f}x')
+
+
+BENCHMARKS = {
+    'templates': bench_templates,
+    'compression': bench_compression,
+    'read_write': bench_read_write,
+    'order_intake': bench_order_intake,
+    'serialization': bench_serialization,
+    'catalog': bench_catalog,
+    'offline_menu': bench_offline_menu,
+}
+
+
+if __name__ == '__main__':
+    names = sys.argv[1:] or list(BENCHMARKS)
+    seed_orders()
+    for name in names:
+        BENCHMARKS[name]()
@@ -0,0 +1,186 @@
+"""메뉴 카탈로그 일괄 가져오기/내보내기 (CSV, Excel, JSON)
+
+가져올 파일의 메뉴는 메뉴ID(내보낸 파일의 id), 없으면 메뉴명으로 현재 메뉴와 맞춰 추가/변경/제외 목록을
+먼저 보여주고, 적용하면 한 트랜잭션에서 일괄 INSERT/UPDATE로 저장합니다.
+파일에 없는 메뉴는 주문 내역이 참조하므로 삭제하지 않고, 선택 시 품절 처리합니다.
+"""
+from sqlalchemy import insert, update, func
+from datetime import datetime
+from io import BytesIO
+import json
+import os
+import pandas as pd
+
+from models import db, Menu
+from serializers import menu_dicts
+
+CATALOG_FORMATS = {
+    'csv': ('text/csv', '.csv'),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', '.xlsx'),
+    'json': ('application/json', '.json'),
+}
+
+# 필드: CSV/Excel 컬럼명 (JSON은 필드명 사용)
+CATALOG_COLUMNS = {
+    'id': '메뉴ID',
+    'name': '메뉴명',
+    'category': '카테고리',
+    'price': '가격',
+    'description': '설명',
+    'temperature_option': '온도옵션',
+    'display_order': '표시순서',
+    'is_soldout': '품절',
+}
+
+REQUIRED_FIELDS = ('name', 'category', 'price')
+
+TEMPERATURE_OPTIONS = ('ice', 'hot', 'both')
+
+_TRUE_VALUES = {'true', '1', 'y', 'yes', '예', '품절'}
+
+
+def export_catalog(output_format):
+    """현재 메뉴를 파일로 내보내기 (BytesIO, mimetype, 확장자)"""
+    mimetype, extension = CATALOG_FORMATS[output_format]
+    menus = menu_dicts(fields=','.join(CATALOG_COLUMNS))
+    output = BytesIO()
+
+    if output_format == 'json':
+        output.write(json.dumps(menus, ensure_ascii=False, indent=2).encode('utf-8'))
+    else:
+        df = pd.DataFrame(menus, columns=list(CATALOG_COLUMNS)).rename(columns=CATALOG_COLUMNS)
+        if output_format == 'csv':
+            # Excel에서 한글이 깨지지 않도록 BOM 포함
+            output.write(df.to_csv(index=False).encode('utf-8-sig'))
+        else:
+            with pd.ExcelWriter(output, engine='openpyxl') as writer:
+                df.to_excel(writer, sheet_name='메뉴', index=False)
+
+    output.seek(0)
+    return output, mimetype, extension
+
+
+def read_catalog(file):
+    """업로드 파일을 읽어 메뉴 행 목록과 오류 목록 반환"""
+    extension = os.path.splitext(file.filename)[1].lower()
+    if extension == '.csv':
+        df = pd.read_csv(file, encoding='utf-8-sig', dtype=str, keep_default_na=False)
+    elif extension in ('.xlsx', '.xls'):
+        df = pd.read_excel(file, dtype=str, keep_default_na=False)
+    elif extension == '.json':
+        df = pd.DataFrame(json.load(file)).astype(object).where(lambda frame: frame.notna(), '')
+    else:
+        raise ValueError('CSV, Excel, JSON 파일만 가져올 수 있습니다.')
+
+    df = df.rename(columns={column: field for field, column in CATALOG_COLUMNS.items()})
+    missing = [CATALOG_COLUMNS[field] for field in REQUIRED_FIELDS if field not in df.columns]
+    if missing:
+        raise ValueError(f'필수 컬럼이 없습니다: {", ".join(missing)}')
+
+    fields = [field for field in CATALOG_COLUMNS if field in df.columns]
+    rows, errors = [], []
+    for line, record in enumerate(df[fields].to_dict('records'), start=2):
+        row, error = _clean_row(record)
+        if error:
+            errors.append(f'{line}행: {error}')
+        else:
+            rows.append(row)
+
+    names = pd.Series([row['name'] for row in rows])
+    for name in names[names.duplicated()].unique():
+        errors.append(f'메뉴명이 중복되었습니다: {name}')
+    return rows, errors
+
+
+def _clean_row(record):
+    """한 행의 값을 검사하고 저장할 형식으로 변환 (빈 값인 선택 필드는 변경하지 않음)"""
+    record = {field: str(value).strip() for field, value in record.items()}
+    if not record['name'] or not record['category']:
+        return None, '메뉴명과 카테고리는 필수입니다.'
+
+    row = {'name': record['name'], 'category': record['category']}
+    try:
+        row['price'] = float(record['price'])
+        if record.get('id'):
+            row['id'] = int(float(record['id']))
+        if record.get('display_order'):
+            row['display_order'] = int(float(record['display_order']))
+    except ValueError:
+        return None, '메뉴ID, 가격, 표시순서는 숫자여야 합니다.'
+
+    if record.get('temperature_option'):
+        if record['temperature_option'] not in TEMPERATURE_OPTIONS:
+            return None, f'온도옵션은 {", ".join(TEMPERATURE_OPTIONS)} 중 하나여야 합니다.'
+        row['temperature_option'] = record['temperature_option']
+    if record.get('description'):
+        row['description'] = record['description']
+    if record.get('is_soldout'):
+        row['is_soldout'] = record['is_soldout'].lower() in _TRUE_VALUES
+    return row, None
+
+
+def diff_catalog(rows):
+    """현재 메뉴와 비교한 추가/변경/제외 목록"""
+    current = {menu['id']: menu for menu in menu_dicts(fields=','.join(CATALOG_COLUMNS))}
+    ids_by_name = {menu['name']: menu_id for menu_id, menu in current.items()}
+
+    added, changed, matched = [], [], set()
+    for row in rows:
+        menu_id = row.get('id') if row.get('id') in current else ids_by_name.get(row['name'])
+        if menu_id is None or menu_id in matched:
+            added.append({field: value for field, value in row.items() if field != 'id'})
+            continue
+
+        matched.add(menu_id)
+        changes = {
+            field: (current[menu_id][field], value)
+            for field, value in row.items()
+            if field != 'id' and current[menu_id][field] != value
+        }
+        if changes:
+            changed.append({'id': menu_id, 'name': current[menu_id]['name'], 'changes': changes})
+
+    removed = [menu for menu_id, menu in current.items() if menu_id not in matched]
+    return {
+        'added': added,
+        'changed': changed,
+        'removed': removed,
+        'unchanged': len(matched) - len(changed),
+    }
+
+
+def apply_catalog(rows, soldout_missing=False):
+    """가져온 메뉴를 한 트랜잭션으로 저장하고 적용된 변경 목록 반환"""
+    diff = diff_catalog(rows)
+    now = datetime.now()
+
+    try:
+        if diff['added']:
+            # 표시 순서가 없는 새 메뉴는 현재 마지막 순서 뒤에 차례로 배치
+            next_order = (db.session.query(func.max(Menu.display_order)).scalar() or 0) + 1
+            new_menus = []
+            for row in diff['added']:
+                menu = {'temperature_option': 'both', 'is_soldout': False, **row,
+                        'created_at': now, 'updated_at': now}
+                if 'display_order' not in menu:
+                    menu['display_order'] = next_order
+                    next_order += 1
+                new_menus.append(menu)
+            db.session.execute(insert(Menu), new_menus)
+
+        updates = [
+            {'id': change['id'], 'updated_at': now,
+             **{field: new for field, (_, new) in change['changes'].items()}}
+            for change in diff['changed']
+        ]
+        if soldout_missing:
+            updates += [{'id': menu['id'], 'is_soldout': True, 'updated_at': now}
+                        for menu in diff['removed'] if not menu['is_soldout']]
+        if updates:
+            db.session.execute(update(Menu), updates)
+
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return diff
@@ -0,0 +1,89 @@
+from flask import request
+import gzip
+import zlib
+
+try:
+    import brotli
+except ImportError:  # brotli 미설치 시 gzip만 사용
+    brotli = None
+
+
+def compress_body(data, encoding, config):
+    """응답 본문 압축"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=config['COMPRESS_BR_LEVEL'])
+    return gzip.compress(data, compresslevel=config['COMPRESS_LEVEL'], mtime=0)
+
+
+def compress_stream(chunks, encoding, config):
+    """스트리밍 응답을 청크 단위로 압축"""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=config['COMPRESS_BR_LEVEL'])
+        compress, finish = compressor.process, compressor.finish
+    else:
+        compressor = zlib.compressobj(config['COMPRESS_LEVEL'], zlib.DEFLATED, 31)
+        compress, finish = compressor.compress, compressor.flush
+
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        data = compress(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+def choose_encoding(accept_encodings, algorithms):
+    """클라이언트가 허용하는 압축 방식 중 우선순위가 가장 높은 것 선택"""
+    for encoding in algorithms:
+        if encoding == 'br' and brotli is None:
+            continue
+        if accept_encodings[encoding]:
+            return encoding
+    return None
+
+
+def should_compress(response, config):
+    """압축 대상 응답인지 확인"""
+    if response.status_code < 200 or response.status_code in (204, 304):
+        return False
+    if 'Content-Encoding' in response.headers or response.direct_passthrough:
+        return False
+    if response.mimetype not in config['COMPRESS_MIMETYPES']:
+        return False
+    if not response.is_streamed and response.calculate_content_length() < config['COMPRESS_MIN_SIZE']:
+        return False
+    return True
+
+
+def init_compression(app):
+    """HTML/JSON 응답 압축 등록"""
+    app.config.setdefault('COMPRESS_ENABLED', True)
+    app.config.setdefault('COMPRESS_ALGORITHMS', ['br', 'gzip'])
+    app.config.setdefault('COMPRESS_MIMETYPES', ['text/html', 'application/json'])
+    app.config.setdefault('COMPRESS_MIN_SIZE', 500)
+    app.config.setdefault('COMPRESS_LEVEL', 6)
+    app.config.setdefault('COMPRESS_BR_LEVEL', 4)
+
+    @app.after_request
+    def compress_response(response):
+        config = app.config
+        if not config['COMPRESS_ENABLED']:
+            return response
+
+        response.vary.add('Accept-Encoding')
+        if not should_compress(response, config):
+            return response
+
+        encoding = choose_encoding(request.accept_encodings, config['COMPRESS_ALGORITHMS'])
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = compress_stream(response.response, encoding, config)
+            response.headers.pop('Content-Length', None)
+        else:
+            response.set_data(compress_body(response.get_data(), encoding, config))
+
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -6,9 +6,80 @@ SECRET_KEY = os.environ.get('SECRET_KEY') or 'cafe-management-secret-key-2024'
 DEBUG = True
 
 # 데이터베이스 설정
-SQLALCHEMY_DATABASE_URI = 'sqlite:///cafe.db'
+SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///cafe.db'
 SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+# 매장 설정 (매장별 데이터베이스 - SQLite 파일 또는 다른 DB/스키마 URI)
+DEFAULT_STORE = 'main'  # SQLALCHEMY_DATABASE_URI 사용
+STORES = {
+    'main': {'name': '본점'},
+    # 'gangnam': {'name': '강남점', 'database': 'sqlite:///store_gangnam.db'},
+}
+SQLALCHEMY_BINDS = {
+    f'store_{store_id}': store['database']
+    for store_id, store in STORES.items()
+    if store_id != DEFAULT_STORE and store.get('database')
+}
+
+# 읽기/쓰기 분리 (조회 화면은 읽기 전용 연결 사용)
+READ_WRITE_SPLIT = True
+READ_REPLICAS = {}  # 매장 ID: 읽기 복제본 URI (SQLite가 아닌 경우)
+READ_POOL_SIZE = 5
+
+# 주문 접수 그룹 커밋 (쓰기 스레드가 동시에 들어온 주문을 한 트랜잭션으로 저장)
+ORDER_GROUP_COMMIT = True
+ORDER_BATCH_SIZE = 50  # 한 번에 커밋할 최대 주문 수
+ORDER_BATCH_WAIT = 0.0  # 첫 주문 이후 추가 주문을 기다리는 시간 (초, 0이면 이미 쌓인 주문만)
+ORDER_QUEUE_TIMEOUT = 30  # 주문 저장을 기다리는 최대 시간 (초)
+
+# 요청 속도 제한 (클라이언트별 토큰 버킷: 초당 rate개, 최대 burst개 연속 허용)
+# key가 'session'이면 고객 세션별, 아니면 IP별로 제한 (세션이 아직 없으면 IP 사용)
+RATE_LIMIT_ENABLED = True
+RATE_LIMIT_BACKEND = 'memory'  # 'memory' (워커별) 또는 'sqlite' (instance 폴더의 파일로 워커 간 공유)
+RATE_LIMIT_DATABASE = 'rate_limit.db'
+RATE_LIMITS = {
+    'place_order': {'rate': 1, 'burst': 10, 'priority': 'high', 'key': 'session'},
+    'add_to_cart': {'rate': 3, 'burst': 30, 'priority': 'normal'},
+    'update_cart': {'rate': 3, 'burst': 30, 'priority': 'normal', 'key': 'session'},
+    'get_recent_orders': {'rate': 0.2, 'burst': 5, 'priority': 'low'},
+}
+# 처리 중인 요청 수가 이 값을 넘으면 해당 우선순위 요청을 즉시 429로 거절 (high는 차단하지 않음)
+RATE_LIMIT_SHED = {'low': 8, 'normal': 16}
+# 앞단 리버스 프록시(nginx 등) 수. 0보다 크면 X-Forwarded-For/Proto를 신뢰하여 실제 클라이언트 IP 사용
+# (프록시 없이 직접 서비스할 때 켜면 클라이언트가 IP를 속일 수 있으므로 0 유지)
+PROXY_FIX_HOPS = 0
+
+# 준비 완료 예상 시각 (ETA)
+ETA_BARISTAS = 1  # 동시에 제조하는 인원
+ETA_DEFAULT_PREP_MINUTES = 2.0  # 제조 이력이 없는 메뉴의 한 개당 제조 시간 (분)
+ETA_HISTORY_DAYS = 14  # 메뉴별 제조 시간 추정에 사용할 기간 (일)
+ETA_PREP_REFRESH = 600  # 메뉴별 제조 시간 갱신 주기 (초)
+ETA_RESYNC = 300  # 진행 중인 주문으로 대기열을 다시 만드는 주기 (초, 다른 워커의 변경 반영)
+ETA_STALE_MINUTES = 180  # 이 시간보다 오래된 진행 중 주문은 대기열에서 제외 (분)
+ETA_SLOT_MINUTES = 15  # 주문 수 제한 시간대 단위 (분)
+ETA_SLOT_CAPACITY = None  # 시간대별 최대 주문 수 (None이면 제한 없음, SQLite에서 모든 워커에 함께 적용)
+ETA_SLOT_LOOKAHEAD = 8  # 빈 시간대를 찾을 최대 시간대 수 (모두 차면 주문 접수 중단)
+
+# 데이터베이스 유지보수 (요청이 없는 동안 자동 실행)
+MAINTENANCE_ENABLED = True
+MAINTENANCE_INTERVAL = 6  # 통계 갱신/VACUUM/WAL 체크포인트 주기 (시간)
+MAINTENANCE_IDLE_SECONDS = 120  # 마지막 요청 후 이 시간이 지나야 실행 (초)
+MAINTENANCE_CHECK_INTERVAL = 60  # 실행 여부 확인 주기 (초)
+MAINTENANCE_VACUUM_THRESHOLD = 0.2  # 빈 페이지 비율이 이 값 이상이면 최초 1회 전체 VACUUM 후 증분 VACUUM 사용
+MAINTENANCE_VACUUM_PAGES = 1000  # 한 번에 반환할 최대 빈 페이지 수
+BACKUP_FOLDER = 'backups'  # instance 폴더 기준
+BACKUP_INTERVAL = 24  # 백업 주기 (시간)
+BACKUP_KEEP = 7  # 매장별 보관할 백업 수
+BACKUP_STEP_PAGES = 256  # 백업 단계별 복사 페이지 수 (단계 사이에 다른 연결이 쓰기 가능)
+
+# 오프라인 메뉴 (서비스 워커) 설정
+PWA_ENABLED = True
+PWA_CACHE_VERSION = 1  # 사용자 화면 템플릿이나 서비스 워커를 바꾸면 증가 (캐시된 화면 교체)
+PWA_APP_NAME = '카페 주문'
+PWA_THEME_COLOR = '#212529'
+PWA_IMAGE_CACHE_LIMIT = 100  # 기기에 캐시할 최대 메뉴 이미지 수
+PWA_REVALIDATE_TIMEOUT = 3  # 메뉴 버전 확인을 기다리는 최대 시간 (초, 넘으면 캐시된 화면 표시)
+
 # 파일 업로드 설정
 UPLOAD_FOLDER = 'static/uploads'
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
@@ -19,6 +90,31 @@ PERMANENT_SESSION_LIFETIME = timedelta(days=1)
 SESSION_TYPE = 'filesystem'
 SESSION_FILE_DIR = './flask_session'
 
+# 템플릿 캐시 설정
+TEMPLATE_BYTECODE_CACHE_DIR = './jinja_cache'
+FRAGMENT_CACHE_ENABLED = True
+FRAGMENT_CACHE_THRESHOLD = 500  # 최대 저장 조각 수
+FRAGMENT_CACHE_TIMEOUT = 0  # 0 = 만료 없음 (버전 스탬프로 무효화)
+
+# 응답 압축 설정
+COMPRESS_ENABLED = True
+COMPRESS_ALGORITHMS = ['br', 'gzip']  # 우선순위 순서 (br은 brotli 설치 시)
+COMPRESS_MIMETYPES = ['text/html', 'application/json']
+COMPRESS_MIN_SIZE = 500  # bytes
+COMPRESS_LEVEL = 6  # gzip 1-9
+COMPRESS_BR_LEVEL = 4  # brotli 0-11
+
+# 주문 보관 설정 (SQLite 전용)
+ARCHIVE_FOLDER = 'archive'  # instance 폴더 기준
+ARCHIVE_AFTER_DAYS = 90
+ARCHIVE_STATUSES = ['completed', 'cancelled']
+
+# 영수증 설정
+RECEIPT_BATCH_LIMIT = 200  # 한 번에 출력할 최대 주문 수
+RECEIPT_CACHE_THRESHOLD = 1000
+RECEIPT_TEXT_WIDTH = 42  # 영수증 프린터 한 줄 글자 수 (80mm 기준)
+RECEIPT_WORKERS = 2  # 텍스트/PDF 생성 프로세스 수
+
 # 관리자 인증 설정
 ADMIN_USERNAME = 'admin'
 ADMIN_PASSWORD = 'cafe123!'
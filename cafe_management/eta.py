@@ -0,0 +1,250 @@
+"""주문 준비 완료 예상 시각 (ETA)
+
+매장별로 진행 중인 주문(접수/준비중)의 예상 제조 시간 합계를 메모리에 유지하고, 주문이 커밋될 때마다
+증감만 반영하므로 장바구니 화면에서 예상 시각을 계산할 때 주문 목록을 다시 조회하지 않습니다.
+메뉴별 한 개당 제조 시간은 상태 변경 이력(준비중 → 준비완료)으로 추정하며,
+다른 워커에서 처리된 주문을 반영하기 위해 ETA_RESYNC마다 진행 중인 주문으로 상태를 다시 만듭니다.
+ETA_SLOT_CAPACITY를 지정하면 시간대(ETA_SLOT_MINUTES)별 주문 수를 제한하고 빈 시간대로 예상 시각을 미룹니다.
+시간대별 주문 수는 cafe_pickup_slot 테이블에 있고 주문을 저장하는 트랜잭션에서 예약하므로 모든 워커에 함께 적용됩니다.
+"""
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, selectinload
+from datetime import datetime, timedelta
+import threading
+import time
+import pandas as pd
+
+from models import db, Order, OrderItem, PickupSlot
+from order_metrics import order_timings
+from stores import current_store, reading
+
+OPEN_STATUSES = ('pending', 'preparing')
+
+
+def _slot_start(moment, slot_minutes):
+    """moment가 속한 시간대의 시작 시각"""
+    minutes = (moment.hour * 60 + moment.minute) // slot_minutes * slot_minutes
+    return moment.replace(hour=minutes // 60, minute=minutes % 60, second=0, microsecond=0)
+
+
+class QueueState:
+    """매장 하나의 진행 중인 주문 작업량"""
+
+    def __init__(self, config):
+        self.config = config
+        self.lock = threading.Lock()
+        self.orders = {}  # 주문 ID: 예상 제조 시간(분)
+        self.backlog = 0.0
+        self.prep_minutes = {}  # 메뉴 ID: 한 개당 제조 시간(분)
+        self.synced_at = None
+        self.prep_refreshed_at = None
+
+    def item_minutes(self, menu_id):
+        return self.prep_minutes.get(menu_id, self.config['ETA_DEFAULT_PREP_MINUTES'])
+
+    def order_minutes(self, items):
+        """(메뉴 ID, 수량) 목록의 예상 제조 시간(분)"""
+        return sum(quantity * self.item_minutes(menu_id) for menu_id, quantity in items)
+
+    def estimate(self, minutes, now=None):
+        """현재 작업량 뒤에 minutes만큼 작업할 때 완료 시각과 앞선 주문 수"""
+        with self.lock:
+            ready_at = (now or datetime.now()) + timedelta(minutes=(self.backlog + minutes) / self.config['ETA_BARISTAS'])
+            return ready_at, len(self.orders)
+
+    def add(self, order_id, minutes):
+        with self.lock:
+            if order_id in self.orders:
+                return
+            self.orders[order_id] = minutes
+            self.backlog += minutes
+
+    def remove(self, order_id):
+        with self.lock:
+            minutes = self.orders.pop(order_id, None)
+            if minutes is not None:
+                self.backlog = max(self.backlog - minutes, 0.0)
+
+    def reset(self, open_orders):
+        """진행 중인 주문 [(주문 ID, 예상 제조 시간)]으로 상태를 다시 만듦"""
+        with self.lock:
+            self.orders = dict(open_orders)
+            self.backlog = float(sum(self.orders.values()))
+        self.synced_at = time.monotonic()
+
+
+def _candidate_slots(ready_at):
+    """ready_at이 속한 시간대부터 ETA_SLOT_LOOKAHEAD개의 시간대 시작 시각"""
+    slot_minutes = current_app.config['ETA_SLOT_MINUTES']
+    first = _slot_start(ready_at, slot_minutes)
+    return [first + timedelta(minutes=slot_minutes * i) for i in range(current_app.config['ETA_SLOT_LOOKAHEAD'])]
+
+
+def open_slot(ready_at):
+    """ready_at 이후 자리가 남은 첫 시간대 시작 시각 (모두 찼으면 None, 표시용)"""
+    slots = _candidate_slots(ready_at)
+    taken = dict(db.session.query(PickupSlot.slot_start, PickupSlot.orders).filter(
+        PickupSlot.slot_start >= slots[0],
+        PickupSlot.slot_start <= slots[-1]
+    ).all())
+    for slot in slots:
+        if taken.get(slot, 0) < current_app.config['ETA_SLOT_CAPACITY']:
+            return slot
+    return None
+
+
+def reserve_slot(ready_at):
+    """ready_at 이후 자리가 남은 첫 시간대를 현재 트랜잭션에서 예약하고 시작 시각 반환 (모두 찼으면 None)
+
+    주문 저장과 같은 트랜잭션에서 정원 미만일 때만 주문 수를 늘리므로, 여러 요청이나 워커 프로세스가
+    동시에 주문해도 시간대 정원을 넘지 않고 저장이 실패하면 예약도 함께 취소됩니다.
+    """
+    table = PickupSlot.__table__
+    for slot in _candidate_slots(ready_at):
+        statement = sqlite_insert(table).values(slot_start=slot, orders=1).on_conflict_do_update(
+            index_elements=[table.c.slot_start],
+            set_={'orders': table.c.orders + 1},
+            where=table.c.orders < current_app.config['ETA_SLOT_CAPACITY']
+        )
+        if db.session.execute(statement).rowcount:
+            return slot
+    return None
+
+
+def estimate_prep_minutes(history_days):
+    """메뉴별 한 개당 제조 시간(분) 중앙값
+
+    주문의 제조 시간을 주문 전체 수량으로 나눈 값을 그 주문에 포함된 메뉴들의 표본으로 사용합니다.
+    """
+    start_date = datetime.now().date() - timedelta(days=history_days)
+    timings = order_timings(start_date)
+    prep = timings['prep_time'].dropna()
+    prep = prep[prep > 0]
+    if prep.empty:
+        return {}
+
+    items = pd.DataFrame(
+        db.session.query(OrderItem.order_id, OrderItem.menu_id, OrderItem.quantity)
+                  .filter(OrderItem.order_id.in_([int(order_id) for order_id in prep.index]))
+                  .all(),
+        columns=['order_id', 'menu_id', 'quantity']
+    )
+    if items.empty:
+        return {}
+
+    per_item = prep / items.groupby('order_id')['quantity'].sum()
+    samples = items[['order_id', 'menu_id']].join(per_item.rename('minutes'), on='order_id').dropna()
+    return {int(menu_id): float(minutes) for menu_id, minutes in samples.groupby('menu_id')['minutes'].median().items()}
+
+
+def _open_orders():
+    """진행 중인 주문의 (주문 ID, [(메뉴 ID, 수량)]) 목록 (오래 방치된 주문 제외)"""
+    since = datetime.now() - timedelta(minutes=current_app.config['ETA_STALE_MINUTES'])
+    orders = Order.query.options(selectinload(Order.order_items)).filter(
+        Order.status.in_(OPEN_STATUSES),
+        Order.order_date >= since
+    ).order_by(Order.order_date.asc(), Order.id.asc()).all()
+    return [(order.id, [(item.menu_id, item.quantity) for item in order.order_items]) for order in orders]
+
+
+def queue_state():
+    """현재 매장의 대기열 상태 (주기적으로 메뉴 제조 시간 갱신 및 재동기화)"""
+    app = current_app._get_current_object()
+    store_id = current_store()
+    with app.extensions['eta_lock']:
+        state = app.extensions['eta_queues'].get(store_id)
+        if state is None:
+            state = app.extensions['eta_queues'][store_id] = QueueState(app.config)
+
+    now = time.monotonic()
+    if state.prep_refreshed_at is None or now - state.prep_refreshed_at > app.config['ETA_PREP_REFRESH']:
+        with reading():
+            state.prep_minutes = estimate_prep_minutes(app.config['ETA_HISTORY_DAYS'])
+        state.prep_refreshed_at = now
+        state.synced_at = None  # 제조 시간이 바뀌었으므로 작업량도 다시 계산
+
+    if state.synced_at is None or now - state.synced_at > app.config['ETA_RESYNC']:
+        with reading():
+            open_orders = _open_orders()
+        state.reset([(order_id, state.order_minutes(items)) for order_id, items in open_orders])
+
+    return state
+
+
+def estimate_ready_time(cart):
+    """장바구니 주문의 예상 준비 완료 시각
+
+    {'ready_at': 예상 시각 (시간대가 모두 차서 접수할 수 없으면 None), 'earliest_at': 시간대 제한 전 예상 시각,
+     'wait_minutes', 'queue_orders'} 반환
+    """
+    state = queue_state()
+    minutes = state.order_minutes((item['menu_id'], item['quantity']) for item in cart.values())
+    now = datetime.now()
+    earliest_at, queue_orders = state.estimate(minutes, now)
+    ready_at = earliest_at
+    if current_app.config['ETA_SLOT_CAPACITY']:
+        with reading():
+            slot = open_slot(earliest_at)
+        ready_at = max(earliest_at, slot) if slot else None
+    return {
+        'ready_at': ready_at,
+        'earliest_at': earliest_at,
+        'wait_minutes': max(round((ready_at - now).total_seconds() / 60), 1) if ready_at else None,
+        'queue_orders': queue_orders,
+    }
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_queue_changes(session, flush_context):
+    """flush된 주문 중 대기열에 추가/제외할 주문 기록"""
+    if not has_app_context() or 'eta_queues' not in current_app.extensions:
+        return
+
+    added, removed = [], []
+    for obj in session.new:
+        if isinstance(obj, Order) and obj.status in OPEN_STATUSES:
+            # flush 중 지연 로딩을 하지 않도록 이미 메모리에 있는 주문 항목만 사용
+            items = obj.__dict__.get('order_items', [])
+            added.append((obj.id, [(item.menu_id, item.quantity) for item in items]))
+    for obj in session.dirty:
+        if isinstance(obj, Order) and obj.status not in OPEN_STATUSES \
+                and inspect(obj).attrs.status.history.has_changes():
+            removed.append(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, Order):
+            removed.append(obj.id)
+
+    if added or removed:
+        changes = session.info.setdefault('eta_changes', [])
+        changes.append((current_store(), added, removed))
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_queue_changes(session):
+    """커밋된 주문만 대기열에 반영"""
+    changes = session.info.pop('eta_changes', None)
+    if not changes:
+        return
+
+    queues = current_app.extensions['eta_queues']
+    for store_id, added, removed in changes:
+        state = queues.get(store_id)
+        if state is None or state.synced_at is None:
+            continue  # 처음 사용할 때 전체 동기화됨
+        for order_id, items in added:
+            state.add(order_id, state.order_minutes(items))
+        for order_id in removed:
+            state.remove(order_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_queue_changes(session):
+    session.info.pop('eta_changes', None)
+
+
+def init_eta(app):
+    """매장별 대기열 상태 저장소 생성"""
+    app.extensions['eta_queues'] = {}
+    app.extensions['eta_lock'] = threading.Lock()
@@ -0,0 +1,249 @@
+"""SQLite 데이터베이스 유지보수 (통계 갱신, 증분 VACUUM, WAL 체크포인트, 온라인 백업)
+
+요청이 MAINTENANCE_IDLE_SECONDS 동안 없을 때 백그라운드 스레드가 매장별로 MAINTENANCE_INTERVAL마다
+PRAGMA optimize(처음에는 ANALYZE), 빈 페이지 반환, WAL 체크포인트를 실행하고, BACKUP_INTERVAL마다
+SQLite 백업 API로 instance/backups/<매장>/에 백업을 만들어 최근 BACKUP_KEEP개만 남깁니다.
+백업은 BACKUP_STEP_PAGES 페이지씩 나누어 복사하므로 백업 중에도 주문을 저장할 수 있습니다.
+마지막 실행 결과는 instance/maintenance.json에 기록되어 모든 워커가 공유합니다.
+"""
+from flask import current_app
+from datetime import datetime, timedelta
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from stores import current_engine, current_store, use_store
+
+STATE_FILE = 'maintenance.json'
+
+AUTO_VACUUM_MODES = {0: 'none', 1: 'full', 2: 'incremental'}
+
+_state_lock = threading.Lock()
+
+
+def sqlite_path(engine):
+    """SQLite 파일 데이터베이스 경로 (그 외에는 None)"""
+    if engine.dialect.name != 'sqlite' or engine.url.database in (None, '', ':memory:'):
+        return None
+    return engine.url.database
+
+
+def _state_path():
+    return os.path.join(current_app.instance_path, STATE_FILE)
+
+
+def load_state():
+    """매장별 마지막 유지보수/백업 기록"""
+    try:
+        with open(_state_path(), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _update_state(store_id, **values):
+    with _state_lock:
+        state = load_state()
+        state.setdefault(store_id, {}).update(values)
+        path = _state_path()
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+        os.replace(path + '.tmp', path)
+
+
+def _pragma(conn, name):
+    return conn.exec_driver_sql(f'PRAGMA {name}').scalar()
+
+
+def run_maintenance():
+    """현재 매장 데이터베이스 정리 후 결과 반환"""
+    config = current_app.config
+    started = time.perf_counter()
+    result = {}
+
+    with current_engine().connect() as conn:
+        conn = conn.execution_options(isolation_level='AUTOCOMMIT')
+
+        # 통계가 없으면 전체 ANALYZE, 있으면 필요한 테이블만 갱신
+        analyzed = conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+        ).first()
+        conn.exec_driver_sql('PRAGMA optimize' if analyzed else 'ANALYZE')
+        result['analyze'] = 'optimize' if analyzed else 'analyze'
+
+        page_count = _pragma(conn, 'page_count')
+        free_pages = _pragma(conn, 'freelist_count')
+        auto_vacuum = _pragma(conn, 'auto_vacuum')
+
+        if auto_vacuum == 2:
+            if free_pages:
+                conn.exec_driver_sql(f'PRAGMA incremental_vacuum({config["MAINTENANCE_VACUUM_PAGES"]})').fetchall()
+            result['vacuum'] = 'incremental'
+        elif page_count and free_pages / page_count >= config['MAINTENANCE_VACUUM_THRESHOLD']:
+            # 최초 한 번 전체 VACUUM으로 증분 VACUUM 모드 전환
+            conn.exec_driver_sql('PRAGMA auto_vacuum = INCREMENTAL')
+            conn.exec_driver_sql('VACUUM')
+            result['vacuum'] = 'full'
+        result['freed_pages'] = free_pages - _pragma(conn, 'freelist_count')
+
+        if _pragma(conn, 'journal_mode') == 'wal':
+            busy, log_frames, checkpointed = conn.exec_driver_sql('PRAGMA wal_checkpoint(TRUNCATE)').first()
+            result['checkpoint'] = {'busy': bool(busy), 'frames': log_frames, 'checkpointed': checkpointed}
+
+    result['seconds'] = round(time.perf_counter() - started, 3)
+    _update_state(current_store(), last_maintenance=datetime.now().isoformat(timespec='seconds'),
+                  last_maintenance_result=result)
+    return result
+
+
+def backup_folder():
+    return os.path.join(current_app.instance_path, current_app.config['BACKUP_FOLDER'], current_store())
+
+
+def list_backups():
+    """현재 매장의 백업 파일 목록 (최신순)"""
+    folder = backup_folder()
+    if not os.path.isdir(folder):
+        return []
+    names = sorted((name for name in os.listdir(folder) if name.endswith('.db')), reverse=True)
+    return [
+        {
+            'name': name,
+            'size': os.path.getsize(os.path.join(folder, name)),
+            'created_at': datetime.fromtimestamp(os.path.getmtime(os.path.join(folder, name))),
+        }
+        for name in names
+    ]
+
+
+def backup_database():
+    """현재 매장 데이터베이스를 온라인 백업하고 보관 개수를 넘는 오래된 백업 삭제"""
+    config = current_app.config
+    folder = backup_folder()
+    os.makedirs(folder, exist_ok=True)
+    target = os.path.join(folder, f'cafe_{datetime.now().strftime("%Y%m%d_%H%M%S")}.db')
+
+    source = current_engine().raw_connection()
+    try:
+        destination = sqlite3.connect(target + '.tmp')
+        try:
+            source.driver_connection.backup(destination, pages=config['BACKUP_STEP_PAGES'], sleep=0.01)
+        finally:
+            destination.close()
+        os.replace(target + '.tmp', target)
+    finally:
+        source.close()
+
+    for backup in list_backups()[config['BACKUP_KEEP']:]:
+        os.remove(os.path.join(folder, backup['name']))
+
+    _update_state(current_store(), last_backup=datetime.now().isoformat(timespec='seconds'))
+    return target
+
+
+def database_stats():
+    """현재 매장 데이터베이스 크기, 조각화, 마지막 유지보수 정보"""
+    engine = current_engine()
+    path = sqlite_path(engine)
+    if path is None:
+        return None
+
+    with engine.connect() as conn:
+        page_size = _pragma(conn, 'page_size')
+        page_count = _pragma(conn, 'page_count')
+        free_pages = _pragma(conn, 'freelist_count')
+        auto_vacuum = _pragma(conn, 'auto_vacuum')
+        journal_mode = _pragma(conn, 'journal_mode')
+
+    wal_path = path + '-wal'
+    state = load_state().get(current_store(), {})
+    return {
+        'path': path,
+        'size': page_size * page_count,
+        'wal_size': os.path.getsize(wal_path) if os.path.exists(wal_path) else 0,
+        'page_count': page_count,
+        'free_pages': free_pages,
+        'fragmentation': round(free_pages / page_count * 100, 1) if page_count else 0,
+        'auto_vacuum': AUTO_VACUUM_MODES.get(auto_vacuum, auto_vacuum),
+        'journal_mode': journal_mode,
+        'last_maintenance': state.get('last_maintenance'),
+        'last_maintenance_result': state.get('last_maintenance_result'),
+        'last_backup': state.get('last_backup'),
+        'backups': list_backups(),
+    }
+
+
+def _due(last_run, hours):
+    return last_run is None or datetime.fromisoformat(last_run) <= datetime.now() - timedelta(hours=hours)
+
+
+def run_due_tasks():
+    """주기가 지난 매장의 유지보수/백업 실행"""
+    config = current_app.config
+    for store_id in config['STORES']:
+        with use_store(store_id):
+            if sqlite_path(current_engine()) is None:
+                continue
+            state = load_state().get(store_id, {})
+            try:
+                if _due(state.get('last_maintenance'), config['MAINTENANCE_INTERVAL']):
+                    run_maintenance()
+                if _due(state.get('last_backup'), config['BACKUP_INTERVAL']):
+                    backup_database()
+            except Exception:
+                current_app.logger.exception(f'[{store_id}] 데이터베이스 유지보수 실패')
+
+
+class MaintenanceScheduler:
+    """요청이 없는 동안 유지보수를 실행하는 백그라운드 스레드 (첫 요청 때 시작)"""
+
+    def __init__(self, app):
+        self.app = app
+        self.last_request = time.monotonic()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def touch(self):
+        self.last_request = time.monotonic()
+        if self.thread is None:
+            with self.lock:
+                if self.thread is None:
+                    self.thread = threading.Thread(target=self._run, name='db-maintenance', daemon=True)
+                    self.thread.start()
+
+    def _run(self):
+        config = self.app.config
+        while True:
+            time.sleep(config['MAINTENANCE_CHECK_INTERVAL'])
+            if time.monotonic() - self.last_request < config['MAINTENANCE_IDLE_SECONDS']:
+                continue
+            with self.app.app_context():
+                run_due_tasks()
+
+
+def init_maintenance(app):
+    """유지보수 스케줄러 및 명령 등록"""
+    if app.config['MAINTENANCE_ENABLED']:
+        scheduler = MaintenanceScheduler(app)
+
+        @app.before_request
+        def record_activity():
+            scheduler.touch()
+
+    @app.cli.command('maintain-db')
+    def maintain_db_command():
+        """데이터베이스 정리 (모든 매장)"""
+        for store_id in app.config['STORES']:
+            with use_store(store_id):
+                if sqlite_path(current_engine()) is not None:
+                    print(f'[{store_id}] {run_maintenance()}')
+
+    @app.cli.command('backup-db')
+    def backup_db_command():
+        """데이터베이스 온라인 백업 (모든 매장)"""
+        for store_id in app.config['STORES']:
+            with use_store(store_id):
+                if sqlite_path(current_engine()) is not None:
+                    print(f'[{store_id}] {backup_database()}')
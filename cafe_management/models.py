@@ -1,8 +1,11 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import func, event, inspect
 from datetime import datetime
 import os
 
-db = SQLAlchemy()
+from stores import StoreRoutingSession, use_store, current_engine
+
+db = SQLAlchemy(session_options={'class_': StoreRoutingSession})
 
 class Menu(db.Model):
     """메뉴 테이블"""
@@ -86,7 +89,7 @@ class OrderItem(db.Model):
     __tablename__ = 'cafe_order_item'
     
     id = db.Column(db.Integer, primary_key=True)
-    order_id = db.Column(db.Integer, db.ForeignKey('cafe_order.id'), nullable=False)
+    order_id = db.Column(db.Integer, db.ForeignKey('cafe_order.id'), nullable=False, index=True)
     menu_id = db.Column(db.Integer, db.ForeignKey('cafe_menu.id'), nullable=False)
     quantity = db.Column(db.Integer, nullable=False)
     subtotal = db.Column(db.Float, nullable=False)
@@ -112,35 +115,105 @@ class OrderItem(db.Model):
         }
 
 
+class OrderStatusHistory(db.Model):
+    """주문 상태 변경 이력 테이블 (추가만 함)"""
+    __tablename__ = 'cafe_order_status_history'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    order_id = db.Column(db.Integer, nullable=False, index=True)  # 주문 보관 후에도 이력 유지 (삭제 시 함께 삭제)
+    from_status = db.Column(db.String(20), nullable=True)  # 주문 생성 시 None
+    to_status = db.Column(db.String(20), nullable=False)
+    changed_at = db.Column(db.DateTime, nullable=False, default=datetime.now, index=True)
+    
+    def __repr__(self):
+        return f'<OrderStatusHistory {self.order_id} {self.from_status} -> {self.to_status}>'
+
+
+class PickupSlot(db.Model):
+    """픽업 시간대별 예약된 주문 수 (ETA_SLOT_CAPACITY 사용 시)"""
+    __tablename__ = 'cafe_pickup_slot'
+    
+    slot_start = db.Column(db.DateTime, primary_key=True)
+    orders = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<PickupSlot {self.slot_start} x {self.orders}>'
+
+
+@event.listens_for(Order, 'after_insert')
+def _record_order_created(mapper, connection, target):
+    """주문 생성 시 첫 상태 기록"""
+    connection.execute(OrderStatusHistory.__table__.insert().values(
+        order_id=target.id,
+        from_status=None,
+        to_status=target.status,
+        changed_at=target.order_date or datetime.now()
+    ))
+
+
+@event.listens_for(Order, 'after_update')
+def _record_status_change(mapper, connection, target):
+    """주문 상태가 바뀐 경우 변경 기록"""
+    history = inspect(target).attrs.status.history
+    if not history.has_changes():
+        return
+    
+    connection.execute(OrderStatusHistory.__table__.insert().values(
+        order_id=target.id,
+        from_status=history.deleted[0] if history.deleted else None,
+        to_status=target.status,
+        changed_at=datetime.now()
+    ))
+
+
+@event.listens_for(Order, 'after_delete')
+def _delete_order_history(mapper, connection, target):
+    """주문 삭제 시 이력도 삭제
+
+    cafe_order.id는 AUTOINCREMENT가 아니어서 마지막 주문을 지우면 다음 주문이 같은 ID를 받으므로,
+    이력을 남겨 두면 새 주문이 지운 주문의 상태 변경을 물려받습니다.
+    """
+    connection.execute(OrderStatusHistory.__table__.delete().where(
+        OrderStatusHistory.order_id == target.id
+    ))
+
+
 def init_db(app):
     """데이터베이스 초기화"""
     db.init_app(app)
     
     with app.app_context():
-        # 테이블 생성
-        db.create_all()
+        for store_id in app.config['STORES']:
+            with use_store(store_id):
+                _init_store_db()
+
+
+def _init_store_db():
+    """현재 매장 데이터베이스의 테이블 생성 및 기본 데이터 삽입"""
+    # 테이블 생성
+    db.metadata.create_all(current_engine())
+    
+    # 기본 메뉴 데이터 삽입 (메뉴가 없는 경우에만)
+    if Menu.query.count() == 0:
+        sample_menus = [
+            Menu(name='아메리카노', category='커피', price=4000, description='깔끔하고 진한 아메리카노', temperature_option='both', display_order=1),
+            Menu(name='카페라떼', category='커피', price=4500, description='부드러운 우유와 에스프레소의 조화', temperature_option='both', display_order=2),
+            Menu(name='카푸치노', category='커피', price=4500, description='풍부한 거품과 에스프레소', temperature_option='both', display_order=3),
+            Menu(name='바닐라라떼', category='커피', price=5000, description='달콤한 바닐라 시럽이 들어간 라떼', temperature_option='both', display_order=4),
+            Menu(name='초콜릿라떼', category='음료', price=5500, description='진한 초콜릿과 우유의 만남', temperature_option='both', display_order=5),
+            Menu(name='딸기라떼', category='음료', price=5500, description='상큼한 딸기와 우유', temperature_option='both', display_order=6),
+            Menu(name='녹차라떼', category='음료', price=5000, description='고소한 녹차와 우유', temperature_option='both', display_order=7),
+            Menu(name='아이스티', category='음료', price=3500, description='시원한 아이스티', temperature_option='ice', display_order=8),
+            Menu(name='치즈케이크', category='디저트', price=6000, description='부드러운 뉴욕 스타일 치즈케이크', display_order=9),
+            Menu(name='초콜릿케이크', category='디저트', price=6500, description='진한 초콜릿 케이크', display_order=10),
+            Menu(name='크로아상', category='베이커리', price=3000, description='바삭한 프랑스식 크로아상', display_order=11),
+        ]
         
-        # 기본 메뉴 데이터 삽입 (메뉴가 없는 경우에만)
-        if Menu.query.count() == 0:
-            sample_menus = [
-                Menu(name='아메리카노', category='커피', price=4000, description='깔끔하고 진한 아메리카노', temperature_option='both', display_order=1),
-                Menu(name='카페라떼', category='커피', price=4500, description='부드러운 우유와 에스프레소의 조화', temperature_option='both', display_order=2),
-                Menu(name='카푸치노', category='커피', price=4500, description='풍부한 거품과 에스프레소', temperature_option='both', display_order=3),
-                Menu(name='바닐라라떼', category='커피', price=5000, description='달콤한 바닐라 시럽이 들어간 라떼', temperature_option='both', display_order=4),
-                Menu(name='초콜릿라떼', category='음료', price=5500, description='진한 초콜릿과 우유의 만남', temperature_option='both', display_order=5),
-                Menu(name='딸기라떼', category='음료', price=5500, description='상큼한 딸기와 우유', temperature_option='both', display_order=6),
-                Menu(name='녹차라떼', category='음료', price=5000, description='고소한 녹차와 우유', temperature_option='both', display_order=7),
-                Menu(name='아이스티', category='음료', price=3500, description='시원한 아이스티', temperature_option='ice', display_order=8),
-                Menu(name='치즈케이크', category='디저트', price=6000, description='부드러운 뉴욕 스타일 치즈케이크', display_order=9),
-                Menu(name='초콜릿케이크', category='디저트', price=6500, description='진한 초콜릿 케이크', display_order=10),
-                Menu(name='크로아상', category='베이커리', price=3000, description='바삭한 프랑스식 크로아상', display_order=11),
-            ]
-            
-            for menu in sample_menus:
-                db.session.add(menu)
-            
-            db.session.commit()
-            print('기본 메뉴 데이터가 삽입되었습니다.')
+        for menu in sample_menus:
+            db.session.add(menu)
+        
+        db.session.commit()
+        print('기본 메뉴 데이터가 삽입되었습니다.')
 
 
 def get_categories():
@@ -170,6 +243,10 @@ def get_sales_data(start_date=None, end_date=None):
     
     orders = query.all()
     
+    # 보관된 주문 포함 (순환 import 방지를 위해 함수 내에서 import)
+    from archive import get_archived_orders
+    orders += get_archived_orders(start_date, end_date, ['completed', 'ready'])
+    
     total_sales = sum(order.total_amount for order in orders)
     total_orders = len(orders)
     
@@ -177,4 +254,28 @@ def get_sales_data(start_date=None, end_date=None):
         'orders': orders,
         'total_sales': total_sales,
         'total_orders': total_orders
-    } 
\ No newline at end of file
+    }
+
+
+def get_sales_summary(start_date=None, end_date=None):
+    """매출 합계 조회 (주문 객체를 만들지 않고 집계만 수행)"""
+    query = db.session.query(
+        func.coalesce(func.sum(Order.total_amount), 0),
+        func.count(Order.id)
+    ).filter(Order.status.in_(['completed', 'ready']))
+    
+    if start_date:
+        query = query.filter(Order.order_date >= start_date)
+    if end_date:
+        query = query.filter(Order.order_date <= end_date)
+    
+    total_sales, total_orders = query.one()
+    
+    # 보관된 주문 포함
+    from archive import get_archived_orders
+    archived = get_archived_orders(start_date, end_date, ['completed', 'ready'])
+    
+    return {
+        'total_sales': total_sales + sum(order.total_amount for order in archived),
+        'total_orders': total_orders + len(archived)
+    }
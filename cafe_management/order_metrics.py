@@ -0,0 +1,102 @@
+"""주문 처리 시간 분석
+
+cafe_order_status_history의 상태 변경 이력으로 주문별 대기 시간(접수 → 준비중), 제조 시간(준비중 → 준비완료),
+처리 시간(접수 → 준비완료)을 분 단위로 계산하고 시간대/메뉴별 중앙값(p50)과 p95를 pandas로 집계합니다.
+준비완료 없이 완료된 주문은 완료 시각을 준비완료 시각으로 사용합니다.
+"""
+from sqlalchemy import select
+from datetime import timedelta
+import pandas as pd
+
+from models import db, Menu, OrderItem, OrderStatusHistory
+
+METRICS = ['queue_wait', 'prep_time', 'fulfillment']
+
+QUANTILES = [0.5, 0.95]
+
+
+def _created_order_ids(start_date=None, end_date=None):
+    """기간 안에 접수된 주문 ID 서브쿼리"""
+    query = db.session.query(OrderStatusHistory.order_id).filter(OrderStatusHistory.from_status.is_(None))
+    if start_date:
+        query = query.filter(OrderStatusHistory.changed_at >= start_date)
+    if end_date:
+        query = query.filter(OrderStatusHistory.changed_at < end_date + timedelta(days=1))
+    return query.subquery()
+
+
+def _minutes(delta):
+    return delta.dt.total_seconds() / 60
+
+
+def order_timings(start_date=None, end_date=None):
+    """주문별 접수 시각과 단계별 소요 시간(분) DataFrame (index: 주문 ID)"""
+    order_ids = _created_order_ids(start_date, end_date)
+    rows = db.session.query(
+        OrderStatusHistory.order_id, OrderStatusHistory.to_status, OrderStatusHistory.changed_at
+    ).filter(OrderStatusHistory.order_id.in_(select(order_ids.c.order_id))).all()
+
+    if not rows:
+        return pd.DataFrame(columns=['ordered_at'] + METRICS)
+
+    history = pd.DataFrame(rows, columns=['order_id', 'to_status', 'changed_at'])
+    # 상태별 처음 도달한 시각
+    reached = (history.groupby(['order_id', 'to_status'])['changed_at'].min()
+                      .unstack()
+                      .reindex(columns=['pending', 'preparing', 'ready', 'completed'])
+                      .astype('datetime64[ns]'))
+    ready = reached['ready'].fillna(reached['completed'])
+
+    return pd.DataFrame({
+        'ordered_at': reached['pending'],
+        'queue_wait': _minutes(reached['preparing'] - reached['pending']),
+        'prep_time': _minutes(ready - reached['preparing']),
+        'fulfillment': _minutes(ready - reached['pending']),
+    }).dropna(subset=['ordered_at'])
+
+
+def _aggregate(grouped, orders):
+    """그룹별 주문 수와 단계별 p50/p95 목록"""
+    quantiles = grouped[METRICS].quantile(QUANTILES).unstack()
+    result = []
+    for key, count in orders.items():
+        row = {'key': key, 'orders': int(count)}
+        for metric in METRICS:
+            row[metric] = tuple(
+                None if pd.isna(value) else round(float(value), 1)
+                for value in (quantiles.loc[key, (metric, q)] for q in QUANTILES)
+            )
+        result.append(row)
+    return result
+
+
+def get_kitchen_metrics(start_date=None, end_date=None):
+    """전체/시간대별/메뉴별 주문 처리 시간 통계"""
+    timings = order_timings(start_date, end_date)
+    if timings.empty:
+        return {'summary': None, 'hourly': [], 'menus': []}
+
+    timings['all'] = '전체'
+    summary = _aggregate(timings.groupby('all'), timings.groupby('all').size())[0]
+
+    hours = timings['ordered_at'].dt.hour
+    hourly = _aggregate(timings.groupby(hours), timings.groupby(hours).size())
+
+    items = pd.DataFrame(
+        db.session.query(OrderItem.order_id, Menu.name, OrderItem.quantity)
+                  .join(Menu, OrderItem.menu_id == Menu.id)
+                  .filter(OrderItem.order_id.in_(select(_created_order_ids(start_date, end_date).c.order_id)))
+                  .all(),
+        columns=['order_id', 'menu_name', 'quantity']
+    )
+    menus = []
+    if not items.empty:
+        menu_timings = items.join(timings[METRICS], on='order_id', how='inner')
+        grouped = menu_timings.groupby('menu_name')
+        menus = _aggregate(grouped, grouped['order_id'].nunique())
+        quantities = grouped['quantity'].sum()
+        for row in menus:
+            row['quantity'] = int(quantities[row['key']])
+        menus.sort(key=lambda row: row['orders'], reverse=True)
+
+    return {'summary': summary, 'hourly': hourly, 'menus': menus}
@@ -0,0 +1,156 @@
+"""주문 접수 큐 (그룹 커밋)
+
+점심시간처럼 주문이 몰릴 때 주문마다 트랜잭션과 fsync를 하지 않도록, 검증된 주문을 매장별 큐에 넣고
+쓰기 스레드가 그동안 쌓인 주문을 한 트랜잭션으로 모아 커밋합니다.
+요청은 자신의 주문이 커밋될 때까지 기다렸다가 주문번호를 받으므로, 고객에게 주문번호가 표시된 주문은
+항상 데이터베이스(WAL)에 기록되어 있습니다. 기다리다 시간이 초과된 주문은 아직 커밋을 시작하지 않았을 때만
+큐에서 취소하고 실패로 알리므로, 고객이 다시 주문해도 같은 주문이 두 번 저장되지 않습니다.
+"""
+from flask import current_app, g
+from concurrent.futures import Future, TimeoutError
+from datetime import datetime
+import queue
+import threading
+import time
+
+from eta import reserve_slot
+from models import db, Order, OrderItem
+from stores import current_store
+
+
+def order_payload(cart, customer_name, delivery_location, delivery_time=None, order_request=None, ready_at=None):
+    """장바구니로 주문 데이터 생성 (접수 시각 기준, ready_at은 시간대 제한 전 예상 준비 완료 시각)"""
+    return {
+        'order_date': datetime.now(),
+        'ready_at': ready_at,
+        'customer_name': customer_name,
+        'delivery_location': delivery_location,
+        'delivery_time': delivery_time,
+        'order_request': order_request,
+        'total_amount': sum(item['subtotal'] for item in cart.values()),
+        'items': [
+            {
+                'menu_id': item['menu_id'],
+                'quantity': item['quantity'],
+                'subtotal': item['subtotal'],
+                'temperature': item['temperature'],
+                'special_request': item['special_request'],
+            }
+            for item in cart.values()
+        ],
+    }
+
+
+def add_order(payload):
+    """주문 데이터로 주문과 주문 항목을 세션에 추가 (커밋하지 않음)
+
+    ETA_SLOT_CAPACITY를 쓰면 같은 트랜잭션에서 픽업 시간대를 예약하고 payload['ready_at']을 예약한 시간대에 맞춥니다.
+    """
+    if payload['ready_at'] and current_app.config['ETA_SLOT_CAPACITY']:
+        slot = reserve_slot(payload['ready_at'])
+        if slot is None:
+            raise ValueError('주문이 많아 지금은 접수할 수 없습니다. 잠시 후 다시 주문해주세요.')
+        payload['ready_at'] = max(payload['ready_at'], slot)
+
+    order = Order(
+        order_date=payload['order_date'],
+        customer_name=payload['customer_name'],
+        delivery_location=payload['delivery_location'],
+        delivery_time=payload['delivery_time'],
+        order_request=payload['order_request'],
+        total_amount=payload['total_amount'],
+        status='pending'
+    )
+    for item in payload['items']:
+        order.order_items.append(OrderItem(**item))
+    db.session.add(order)
+    return order
+
+
+class OrderWriter:
+    """매장 하나의 주문을 묶어서 커밋하는 쓰기 스레드"""
+
+    def __init__(self, app, store_id):
+        self.app = app
+        self.store_id = store_id
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name=f'order-writer-{store_id}', daemon=True)
+        self.thread.start()
+
+    def submit(self, payload):
+        future = Future()
+        self.queue.put((payload, future))
+        return future
+
+    def _next_batch(self):
+        """첫 주문을 기다린 뒤 ORDER_BATCH_WAIT 동안 들어온 주문을 ORDER_BATCH_SIZE까지 모음"""
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + self.app.config['ORDER_BATCH_WAIT']
+        while len(batch) < self.app.config['ORDER_BATCH_SIZE']:
+            timeout = deadline - time.monotonic()
+            try:
+                batch.append(self.queue.get(timeout=timeout) if timeout > 0 else self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            # 기다리던 요청이 시간 초과로 취소한 주문은 저장하지 않음
+            batch = [(payload, future) for payload, future in self._next_batch()
+                     if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            with self.app.app_context():
+                g.store = self.store_id
+                self._commit(batch)
+
+    def _commit(self, batch):
+        try:
+            orders = [add_order(payload) for payload, _ in batch]
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+            else:
+                # 한 건의 오류로 같은 묶음의 다른 주문이 실패하지 않도록 한 건씩 다시 저장
+                for item in batch:
+                    self._commit([item])
+            return
+
+        for order, (_, future) in zip(orders, batch):
+            future.set_result(order.id)
+
+
+def _writer(store_id):
+    """매장의 쓰기 스레드 (처음 사용할 때 시작)"""
+    app = current_app._get_current_object()
+    writers = app.extensions['order_writers']
+    with app.extensions['order_writers_lock']:
+        if store_id not in writers:
+            writers[store_id] = OrderWriter(app, store_id)
+        return writers[store_id]
+
+
+def submit_order(payload):
+    """주문을 저장하고 주문번호 반환 (ORDER_GROUP_COMMIT이면 쓰기 스레드의 커밋을 기다림)"""
+    if not current_app.config['ORDER_GROUP_COMMIT']:
+        order = add_order(payload)
+        db.session.commit()
+        return order.id
+
+    future = _writer(current_store()).submit(payload)
+    try:
+        return future.result(timeout=current_app.config['ORDER_QUEUE_TIMEOUT'])
+    except TimeoutError:
+        if future.cancel():
+            raise TimeoutError('주문 저장이 지연되어 접수되지 않았습니다. 잠시 후 다시 시도해 주세요.')
+        # 이미 커밋 중인 주문은 취소할 수 없으므로 결과를 기다림
+        return future.result()
+
+
+def init_order_queue(app):
+    """매장별 쓰기 스레드 저장소 생성"""
+    app.extensions['order_writers'] = {}
+    app.extensions['order_writers_lock'] = threading.Lock()
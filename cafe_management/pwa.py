@@ -0,0 +1,173 @@
+"""사용자 화면 오프라인 지원 (서비스 워커, 버전이 붙은 메뉴 JSON, 웹 앱 매니페스트)
+
+/user/ 범위의 서비스 워커가 정적 파일, CDN 라이브러리, 메뉴 이미지를 기기에 캐시하고,
+메뉴 화면은 /user/menu.json에 버전(ETag)만 확인해 바뀌지 않았으면(304) 캐시된 화면을 그대로 보여줍니다.
+버전은 매장, 관리자 로그인 여부, 데이터베이스의 메뉴 버전으로 만들므로 워커가 여러 개여도 같습니다.
+연결이 끊긴 동안의 장바구니 추가는 static/js/pwa.js가 기기에 보관했다가 연결되면 차례로 전송합니다.
+"""
+from flask import current_app, g, request, session, render_template, jsonify, url_for, make_response
+import hashlib
+import json
+
+from models import get_categories
+from serializers import menu_dicts
+from stores import current_store, read_only
+from template_cache import menu_version
+
+# 서비스 워커 설치 시 미리 캐시할 CDN 라이브러리 (base.html과 같은 주소)
+CDN_ASSETS = [
+    'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css',
+    'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css',
+    'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js',
+    'https://code.jquery.com/jquery-3.7.0.min.js',
+]
+
+# 메뉴 JSON에 포함할 필드 (image는 image_url로 변환)
+MENU_JSON_FIELDS = 'id,name,category,price,description,image,temperature_option,is_soldout'
+
+# 응답마다 장바구니 수량 쿠키를 갱신할 엔드포인트
+CART_ENDPOINTS = {'user_menu', 'view_cart', 'add_to_cart', 'update_cart', 'place_order', 'clear_cart', 'select_store'}
+
+CART_COOKIE = 'cart_count'
+
+VERSION_HEADER = 'X-Menu-Version'
+
+
+def shell_urls():
+    """서비스 워커 설치 시 미리 캐시할 화면 셸 주소"""
+    asset_url = current_app.jinja_env.globals['asset_url']
+    return [
+        asset_url('css/style.css'),
+        asset_url('js/main.js'),
+        asset_url('js/pwa.js'),
+        url_for('offline_page'),
+    ] + CDN_ASSETS
+
+
+def shell_version():
+    """셸 캐시 버전 (정적 파일 빌드, 서비스 워커 코드, PWA_CACHE_VERSION이 바뀌면 달라짐)"""
+    version = current_app.extensions.get('pwa_shell_version')
+    if version is None:
+        source = current_app.jinja_loader.get_source(current_app.jinja_env, 'pwa/sw.js')[0]
+        key = json.dumps([current_app.config['PWA_CACHE_VERSION'], shell_urls(), source])
+        version = current_app.extensions['pwa_shell_version'] = hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]
+    return version
+
+
+def menu_page_version():
+    """현재 매장의 메뉴 화면 버전 (메뉴 추가/수정/삭제, 매장 변경, 관리자 로그인 시 달라짐)"""
+    key = '|'.join(str(part) for part in (
+        shell_version(), current_store(), bool(session.get('admin_logged_in')), menu_version()
+    ))
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+
+def url_prefix(endpoint):
+    """파일 경로를 받는 라우트의 URL 접두사 (예: /static/)"""
+    return url_for(endpoint, filename='_').rsplit('/', 1)[0] + '/'
+
+
+def cart_count():
+    return sum(item['quantity'] for item in session.get('cart', {}).values())
+
+
+@read_only
+def menu_json():
+    """메뉴 JSON (버전이 같으면 304, 표시할 알림 메시지가 있으면 화면을 새로 받도록 항상 200)"""
+    version = menu_page_version()
+    if request.if_none_match.contains(version) and not session.get('_flashes'):
+        response = make_response('', 304)
+    else:
+        menus = menu_dicts(fields=MENU_JSON_FIELDS, category=request.args.get('category'))
+        for menu in menus:
+            image = menu.pop('image')
+            menu['image_url'] = url_for('static', filename='uploads/' + image) if image else None
+        response = jsonify({
+            'version': version,
+            'store': current_store(),
+            'categories': get_categories(),
+            'menus': menus,
+        })
+
+    response.set_etag(version)
+    response.headers['Cache-Control'] = 'no-cache, private'
+    response.vary.add('Cookie')
+    return response
+
+
+def service_worker():
+    """서비스 워커 스크립트 (/user/ 범위)"""
+    config = current_app.config
+    response = make_response(render_template(
+        'pwa/sw.js',
+        cache_version=shell_version(),
+        shell_urls=shell_urls(),
+        menu_url=url_for('user_menu'),
+        menu_json_url=url_for('menu_json'),
+        offline_url=url_for('offline_page'),
+        version_header=VERSION_HEADER,
+        static_prefix=url_prefix('static'),
+        image_prefix=url_prefix('static') + 'uploads/',
+        asset_prefix=url_prefix('hashed_asset'),
+        image_cache_limit=config['PWA_IMAGE_CACHE_LIMIT'],
+        revalidate_timeout=config['PWA_REVALIDATE_TIMEOUT'] * 1000,
+    ))
+    response.mimetype = 'application/javascript'
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def web_manifest():
+    """웹 앱 매니페스트 (홈 화면 추가)"""
+    config = current_app.config
+    response = jsonify({
+        'name': config['PWA_APP_NAME'],
+        'short_name': config['PWA_APP_NAME'],
+        'start_url': url_for('user_menu'),
+        'scope': url_prefix('service_worker'),
+        'display': 'standalone',
+        'background_color': '#ffffff',
+        'theme_color': config['PWA_THEME_COLOR'],
+        'lang': 'ko',
+    })
+    response.mimetype = 'application/manifest+json'
+    return response
+
+
+def offline_page():
+    """연결이 끊겼을 때 보여줄 화면 (서비스 워커가 미리 캐시)"""
+    return render_template('user/offline.html')
+
+
+def init_pwa(app):
+    """서비스 워커/메뉴 JSON 라우트 및 사용자 화면 캐시 헤더 등록"""
+    app.jinja_env.globals['pwa_enabled'] = app.config['PWA_ENABLED']
+    if not app.config['PWA_ENABLED']:
+        return
+
+    app.add_url_rule('/user/sw.js', 'service_worker', service_worker)
+    app.add_url_rule('/user/manifest.webmanifest', 'web_manifest', web_manifest)
+    app.add_url_rule('/user/menu.json', 'menu_json', menu_json)
+    app.add_url_rule('/user/offline', 'offline_page', offline_page)
+
+    @app.before_request
+    def check_pending_flashes():
+        # 렌더링 중 알림 메시지가 세션에서 제거되므로 미리 확인
+        if request.endpoint in ('user_menu', 'view_cart'):
+            g.pending_flashes = bool(session.get('_flashes'))
+
+    @app.after_request
+    def add_pwa_headers(response):
+        if request.endpoint in CART_ENDPOINTS:
+            # 캐시된 화면에서도 장바구니 수량을 표시할 수 있도록 쿠키로 전달
+            count = str(cart_count())
+            if request.cookies.get(CART_COOKIE) != count:
+                response.set_cookie(CART_COOKIE, count, samesite='Lax')
+
+        if request.endpoint == 'user_menu' and response.status_code == 200:
+            response.headers[VERSION_HEADER] = menu_page_version()
+        if request.endpoint in ('user_menu', 'view_cart') and (
+                g.get('pending_flashes') or session.get('admin_logged_in')):
+            # 한 번만 보여줄 알림이나 관리자 메뉴가 포함된 화면은 서비스 워커가 캐시하지 않음
+            response.headers['Cache-Control'] = 'no-store'
+        return response
@@ -0,0 +1,211 @@
+"""요청 속도 제한 및 과부하 시 요청 차단
+
+RATE_LIMITS에 등록된 엔드포인트는 클라이언트별 토큰 버킷으로 호출 횟수를 제한합니다.
+클라이언트는 IP(리버스 프록시 뒤에서는 PROXY_FIX_HOPS 설정 시 X-Forwarded-For)로 구분하며,
+key가 'session'인 엔드포인트(주문하기 등)는 고객 세션별로 구분하여 같은 IP의 고객끼리 한도를 나누지 않습니다.
+버킷은 프로세스 메모리(memory) 또는 여러 워커가 공유하는 SQLite 파일(sqlite)에 저장합니다.
+처리 중인 요청 수가 RATE_LIMIT_SHED의 우선순위별 한도를 넘으면 낮은 우선순위 요청(주문 목록 폴링 등)부터
+즉시 429로 거절하고, 주문하기(high)는 과부하 차단 대상에서 제외합니다.
+"""
+from flask import g, request, session, jsonify, Response
+from collections import Counter
+import os
+import sqlite3
+import threading
+import time
+
+REJECT_MESSAGE = '요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요.'
+
+# 버킷 수가 이 값을 넘으면 가득 찬 버킷을 정리
+MAX_BUCKETS = 10000
+
+
+def refill(tokens, updated, rate, burst, now):
+    """토큰을 채운 뒤 하나를 사용 (남은 토큰, 다시 시도까지 남은 초) 반환. 허용되면 대기 시간은 0"""
+    tokens = min(burst, tokens + (now - updated) * rate)
+    if tokens >= 1:
+        return tokens - 1, 0
+    return tokens, (1 - tokens) / rate
+
+
+class MemoryBucketStore:
+    """프로세스 메모리 토큰 버킷 (워커마다 별도 한도)"""
+
+    def __init__(self):
+        self.buckets = {}
+        self.rejected = Counter()
+        self.lock = threading.Lock()
+
+    def take(self, key, rate, burst):
+        now = time.monotonic()
+        with self.lock:
+            if len(self.buckets) > MAX_BUCKETS:
+                self._prune(now)
+            tokens, updated = self.buckets.get(key, (burst, now))
+            tokens, retry_after = refill(tokens, updated, rate, burst, now)
+            self.buckets[key] = (tokens, now)
+        return retry_after
+
+    def _prune(self, now):
+        # 마지막 요청 후 1분이 지난 버킷은 대부분 다시 가득 찼으므로 삭제
+        self.buckets = {key: value for key, value in self.buckets.items() if now - value[1] < 60}
+
+    def record_rejection(self, budget, reason):
+        with self.lock:
+            self.rejected[(budget, reason)] += 1
+
+    def rejection_counts(self):
+        with self.lock:
+            return dict(self.rejected)
+
+
+class SQLiteBucketStore:
+    """SQLite 파일 토큰 버킷 (같은 서버의 모든 워커가 한도를 공유)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            # 버킷 상태는 유실되어도 무방하므로 fsync 생략
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('PRAGMA synchronous = OFF')
+            conn.execute('CREATE TABLE IF NOT EXISTS rate_bucket '
+                         '(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)')
+            conn.execute('CREATE TABLE IF NOT EXISTS rate_rejected '
+                         '(budget TEXT NOT NULL, reason TEXT NOT NULL, count INTEGER NOT NULL, '
+                         'PRIMARY KEY (budget, reason))')
+            self.local.conn = conn
+        return conn
+
+    def take(self, key, rate, burst):
+        conn = self._conn()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT tokens, updated FROM rate_bucket WHERE key = ?', (key,)).fetchone()
+            tokens, updated = row or (burst, now)
+            tokens, retry_after = refill(tokens, updated, rate, burst, now)
+            conn.execute('INSERT OR REPLACE INTO rate_bucket (key, tokens, updated) VALUES (?, ?, ?)',
+                         (key, tokens, now))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return retry_after
+
+    def record_rejection(self, budget, reason):
+        self._conn().execute(
+            'INSERT INTO rate_rejected (budget, reason, count) VALUES (?, ?, 1) '
+            'ON CONFLICT (budget, reason) DO UPDATE SET count = count + 1',
+            (budget, reason)
+        )
+
+    def rejection_counts(self):
+        rows = self._conn().execute('SELECT budget, reason, count FROM rate_rejected').fetchall()
+        return {(budget, reason): count for budget, reason, count in rows}
+
+
+class RateLimiter:
+    """엔드포인트별 토큰 버킷과 처리 중인 요청 수 관리"""
+
+    def __init__(self, store, limits, shed):
+        self.store = store
+        self.limits = limits
+        self.shed = shed
+        self.in_flight = 0
+        self.lock = threading.Lock()
+
+    def enter(self):
+        with self.lock:
+            self.in_flight += 1
+            return self.in_flight
+
+    def leave(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    def check(self, endpoint, in_flight):
+        """거절 사유와 다시 시도까지 남은 초 반환 (허용되면 (None, 0))"""
+        limit = self.limits.get(endpoint)
+        if limit is None:
+            return None, 0
+
+        shed_at = self.shed.get(limit.get('priority', 'normal'))
+        if shed_at is not None and in_flight > shed_at:
+            return 'overload', 1
+
+        retry_after = self.store.take(f'{endpoint}:{client_key(limit)}', limit['rate'], limit['burst'])
+        if retry_after:
+            return 'rate', retry_after
+        return None, 0
+
+    def stats(self):
+        rejected = {}
+        for (budget, reason), count in self.store.rejection_counts().items():
+            rejected.setdefault(budget, {})[reason] = count
+        return {'in_flight': self.in_flight, 'rejected': rejected}
+
+
+def client_key(limit):
+    """버킷을 구분할 클라이언트 키
+
+    key가 'session'이면 서버에 저장된 세션 ID를 사용합니다. 쿠키 없이(또는 임의의 세션 ID로) 매번 새 세션을
+    만드는 요청은 저장된 데이터가 없으므로 IP로 제한하여 세션을 바꿔 가며 한도를 피할 수 없습니다.
+    (새 세션에도 들어 있는 '_permanent'는 저장된 데이터로 보지 않음)
+    """
+    sid = getattr(session, 'sid', None)
+    if limit.get('key') == 'session' and sid and any(key != '_permanent' for key in session):
+        return f'session:{sid}'
+    return request.remote_addr
+
+
+def too_many_requests(retry_after):
+    """429 응답 (브라우저 페이지 요청은 텍스트, AJAX는 JSON)"""
+    if request.accept_mimetypes.best == 'text/html':
+        response = Response(REJECT_MESSAGE, status=429, mimetype='text/plain')
+    else:
+        response = jsonify({'success': False, 'message': REJECT_MESSAGE})
+        response.status_code = 429
+    response.headers['Retry-After'] = str(max(int(retry_after + 0.999), 1))
+    return response
+
+
+def create_store(app):
+    if app.config['RATE_LIMIT_BACKEND'] == 'sqlite':
+        os.makedirs(app.instance_path, exist_ok=True)
+        return SQLiteBucketStore(os.path.join(app.instance_path, app.config['RATE_LIMIT_DATABASE']))
+    return MemoryBucketStore()
+
+
+def init_rate_limit(app):
+    """요청 속도 제한 등록"""
+    if not app.config['RATE_LIMIT_ENABLED']:
+        return
+
+    limiter = RateLimiter(create_store(app), app.config['RATE_LIMITS'], app.config['RATE_LIMIT_SHED'])
+    app.extensions['rate_limiter'] = limiter
+
+    @app.before_request
+    def limit_request():
+        g.rate_limit_counted = True
+        in_flight = limiter.enter()
+        try:
+            reason, retry_after = limiter.check(request.endpoint, in_flight)
+            if reason is not None:
+                limiter.store.record_rejection(request.endpoint, reason)
+        except sqlite3.Error:
+            # 버킷 저장소 오류로 주문을 막지 않음
+            app.logger.exception('요청 속도 제한 확인 실패')
+            return None
+
+        if reason is not None:
+            return too_many_requests(retry_after)
+
+    @app.teardown_request
+    def release_request(exc):
+        if g.pop('rate_limit_counted', False):
+            limiter.leave()
@@ -0,0 +1,221 @@
+"""영수증 일괄 생성 (HTML, 영수증 프린터용 텍스트, PDF)
+
+주문 여러 건을 한 번의 쿼리로 읽어 렌더링하고, 결과는 (주문 ID, 수정 시각, 메뉴 버전)을 키로 캐시하므로
+주문과 메뉴가 변경되지 않았으면 다시 출력할 때 렌더링하지 않습니다. 텍스트/PDF 생성은 프로세스 풀에서 실행합니다.
+"""
+from flask import current_app, render_template
+from markupsafe import Markup
+from sqlalchemy.orm import selectinload
+from cachelib import SimpleCache
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+import hashlib
+import multiprocessing
+import threading
+import unicodedata
+
+from models import db, Order, OrderItem
+from stores import current_store
+from template_cache import menu_version
+
+try:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+    from reportlab.pdfgen import canvas
+except ImportError:  # reportlab 미설치 시 PDF 출력 불가
+    canvas = None
+
+RECEIPT_FORMATS = ('html', 'text', 'pdf')
+
+PDF_FONT = 'HYSMyeongJo-Medium'
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def pdf_available():
+    return canvas is not None
+
+
+def _receipt_cache():
+    return current_app.extensions['receipt_cache']
+
+
+def _executor_pool():
+    """텍스트/PDF 생성용 프로세스 풀 (처음 사용할 때 생성)
+
+    요청 스레드와 백그라운드 스레드가 도는 프로세스를 fork하면 잠긴 락이 복사될 수 있으므로 spawn으로 시작합니다.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=current_app.config['RECEIPT_WORKERS'],
+                                            mp_context=multiprocessing.get_context('spawn'))
+        return _executor
+
+
+def _cache_key(kind, order_id, updated_at):
+    """주문 수정 시각과 메뉴 버전을 포함한 캐시 키 (메뉴 이름이 바뀌면 다시 렌더링)"""
+    stamp = updated_at.isoformat() if updated_at else ''
+    return f'receipt:{current_store()}:{kind}:{order_id}:{stamp}:{menu_version()}'
+
+
+def load_orders(order_ids):
+    """주문, 주문 항목, 메뉴를 한 번에 조회 (요청한 순서 유지)"""
+    orders = Order.query.options(
+        selectinload(Order.order_items).joinedload(OrderItem.menu)
+    ).filter(Order.id.in_(order_ids)).all()
+    orders_by_id = {order.id: order for order in orders}
+    return [orders_by_id[order_id] for order_id in order_ids if order_id in orders_by_id]
+
+
+def _order_stamps(order_ids):
+    """주문별 수정 시각 (존재하는 주문만, 요청한 순서 유지)"""
+    rows = db.session.query(Order.id, Order.updated_at).filter(Order.id.in_(order_ids)).all()
+    updated = dict(rows)
+    return [(order_id, updated[order_id]) for order_id in order_ids if order_id in updated]
+
+
+def _render_cached(order_ids, kind, render_many):
+    """캐시에 없는 주문만 조회하여 render_many로 생성하고 주문 순서대로 반환"""
+    cache = _receipt_cache()
+    stamps = _order_stamps(order_ids)
+    results = {order_id: cache.get(_cache_key(kind, order_id, updated_at)) for order_id, updated_at in stamps}
+
+    missing = [order_id for order_id, value in results.items() if value is None]
+    if missing:
+        orders = load_orders(missing)
+        for order, value in zip(orders, render_many(orders)):
+            cache.set(_cache_key(kind, order.id, order.updated_at), value)
+            results[order.id] = value
+
+    return [results[order_id] for order_id, _ in stamps]
+
+
+def render_receipts_html(order_ids):
+    """영수증 HTML 조각 목록"""
+    fragments = _render_cached(
+        order_ids, 'html',
+        lambda orders: [render_template('admin/_receipt.html', order=order) for order in orders]
+    )
+    return [Markup(fragment) for fragment in fragments]
+
+
+def render_receipts_text(order_ids):
+    """영수증 프린터용 텍스트 (주문별 용지 절단 구분)"""
+    width = current_app.config['RECEIPT_TEXT_WIDTH']
+
+    def render_many(orders):
+        payloads = [receipt_payload(order) for order in orders]
+        return list(_executor_pool().map(format_receipt_text, payloads, [width] * len(payloads)))
+
+    return '\f'.join(_render_cached(order_ids, 'text', render_many))
+
+
+def render_receipts_pdf(order_ids):
+    """영수증 PDF (주문별 한 페이지)"""
+    stamps = _order_stamps(order_ids)
+    digest = hashlib.sha1(repr(stamps).encode()).hexdigest()
+    key = f'receipt:{current_store()}:pdf:{digest}'
+
+    cache = _receipt_cache()
+    pdf = cache.get(key)
+    if pdf is None:
+        payloads = [receipt_payload(order) for order in load_orders([order_id for order_id, _ in stamps])]
+        pdf = _executor_pool().submit(build_receipt_pdf, payloads).result()
+        cache.set(key, pdf)
+    return pdf
+
+
+def receipt_payload(order):
+    """프로세스 풀로 전달할 영수증 데이터"""
+    return {
+        'id': order.id,
+        'order_date': order.order_date.strftime('%Y-%m-%d %H:%M:%S'),
+        'customer_name': order.customer_name,
+        'delivery_location': order.delivery_location,
+        'delivery_time': order.delivery_time,
+        'order_request': order.order_request,
+        'status': current_app.config['ORDER_STATUS'].get(order.status, order.status),
+        'total_amount': order.total_amount,
+        'items': [
+            {
+                'name': item.menu.name if item.menu else '',
+                'temperature': '아이스' if item.temperature == 'ice' else '핫',
+                'quantity': item.quantity,
+                'subtotal': int(item.subtotal),
+                'special_request': item.special_request,
+            }
+            for item in order.order_items
+        ],
+    }
+
+
+def _text_width(text):
+    """고정폭 출력 시 표시 폭 (한글 등 전각 문자는 2칸)"""
+    return sum(2 if unicodedata.east_asian_width(ch) in ('W', 'F') else 1 for ch in text)
+
+
+def _pad(left, right, width):
+    return left + ' ' * max(width - _text_width(left) - _text_width(right), 1) + right
+
+
+def format_receipt_text(receipt, width=42):
+    """영수증 프린터용 고정폭 텍스트"""
+    title = '카페 주문 시스템'
+    lines = [
+        ' ' * max((width - _text_width(title)) // 2, 0) + title,
+        '=' * width,
+        f"주문번호: {receipt['id']}",
+        f"주문일시: {receipt['order_date']}",
+        f"고객명: {receipt['customer_name']}",
+        f"배달장소: {receipt['delivery_location']}",
+    ]
+    if receipt['delivery_time']:
+        lines.append(f"배달시간: {receipt['delivery_time']}")
+    lines.append(f"주문상태: {receipt['status']}")
+    lines.append('-' * width)
+
+    for item in receipt['items']:
+        lines.append(_pad(f"{item['name']}({item['temperature']}) x{item['quantity']}",
+                          f"{item['subtotal']:,}원", width))
+        if item['special_request']:
+            lines.append(f"  - {item['special_request']}")
+
+    if receipt['order_request']:
+        lines.append('-' * width)
+        lines.append(f"요청사항: {receipt['order_request']}")
+
+    lines.append('=' * width)
+    lines.append(_pad('총 결제금액', f"{receipt['total_amount']:,}원", width))
+    lines.append('')
+    lines.append('이용해 주셔서 감사합니다!')
+    return '\n'.join(lines) + '\n'
+
+
+def build_receipt_pdf(receipts):
+    """영수증 PDF 생성 (주문별 한 페이지)"""
+    pdfmetrics.registerFont(UnicodeCIDFont(PDF_FONT))
+    output = BytesIO()
+    pdf = canvas.Canvas(output, pagesize=A4)
+    _, height = A4
+
+    for receipt in receipts:
+        text = pdf.beginText(40, height - 50)
+        text.setFont(PDF_FONT, 11)
+        for line in format_receipt_text(receipt).splitlines():
+            text.textLine(line)
+        pdf.drawText(text)
+        pdf.showPage()
+
+    pdf.save()
+    return output.getvalue()
+
+
+def init_receipts(app):
+    """영수증 캐시 생성"""
+    app.extensions['receipt_cache'] = SimpleCache(
+        threshold=app.config['RECEIPT_CACHE_THRESHOLD'],
+        default_timeout=0
+    )
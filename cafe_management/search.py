@@ -0,0 +1,179 @@
+"""주문 전문 검색 (SQLite FTS5)
+
+cafe_order_fts 가상 테이블에 주문별 고객명, 배달 장소, 주문 요청사항, 메뉴별 특별 요청사항을
+저장하고 트리거로 cafe_order / cafe_order_item 변경 시 자동 갱신합니다. rowid는 주문 ID입니다.
+월별 보관 파일로 옮긴 주문은 운영 테이블에서 지워지며 트리거가 색인에서도 지우므로, 보관할 때
+보관 파일의 주문으로 다시 색인하고 검색 결과는 보관 파일에서 읽습니다.
+"""
+from sqlalchemy import text
+from sqlalchemy.orm import selectinload
+import math
+
+from archive import ARCHIVE_SCHEMA, archive_enabled, archive_months, attached, get_archived_orders
+from models import db, Order, OrderItem
+from stores import current_engine, use_store
+
+FTS_TABLE = 'cafe_order_fts'
+
+# 주문 항목의 특별 요청사항을 주문 단위로 합친 값
+_SPECIAL_REQUESTS = "(SELECT coalesce(group_concat(special_request, ' '), '') FROM cafe_order_item WHERE order_id = {ref})"
+
+FTS_SCHEMA = [
+    # 트리거의 주문별 special_request 집계가 cafe_order_item 전체를 훑지 않도록 (기존 DB에도 생성)
+    "CREATE INDEX IF NOT EXISTS ix_cafe_order_item_order_id ON cafe_order_item (order_id)",
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        customer_name, delivery_location, order_request, special_requests,
+        tokenize = 'unicode61'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS cafe_order_fts_ai AFTER INSERT ON cafe_order BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, customer_name, delivery_location, order_request, special_requests)
+        VALUES (new.id, new.customer_name, new.delivery_location, coalesce(new.order_request, ''),
+                {_SPECIAL_REQUESTS.format(ref='new.id')});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS cafe_order_fts_au
+        AFTER UPDATE OF customer_name, delivery_location, order_request ON cafe_order BEGIN
+        UPDATE {FTS_TABLE} SET customer_name = new.customer_name,
+                               delivery_location = new.delivery_location,
+                               order_request = coalesce(new.order_request, '')
+        WHERE rowid = new.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS cafe_order_fts_ad AFTER DELETE ON cafe_order BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS cafe_order_item_fts_ai AFTER INSERT ON cafe_order_item BEGIN
+        UPDATE {FTS_TABLE} SET special_requests = {_SPECIAL_REQUESTS.format(ref='new.order_id')}
+        WHERE rowid = new.order_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS cafe_order_item_fts_au
+        AFTER UPDATE OF special_request, order_id ON cafe_order_item BEGIN
+        UPDATE {FTS_TABLE} SET special_requests = {_SPECIAL_REQUESTS.format(ref='old.order_id')}
+        WHERE rowid = old.order_id;
+        UPDATE {FTS_TABLE} SET special_requests = {_SPECIAL_REQUESTS.format(ref='new.order_id')}
+        WHERE rowid = new.order_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS cafe_order_item_fts_ad AFTER DELETE ON cafe_order_item BEGIN
+        UPDATE {FTS_TABLE} SET special_requests = {_SPECIAL_REQUESTS.format(ref='old.order_id')}
+        WHERE rowid = old.order_id;
+    END""",
+]
+
+
+def search_enabled():
+    """SQLite에서만 전문 검색 사용"""
+    return current_engine().dialect.name == 'sqlite'
+
+
+def create_search_index():
+    """FTS 테이블과 트리거 생성 (처음 생성 시 기존 주문으로 색인 구축)"""
+    with current_engine().begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {'name': FTS_TABLE}
+        ).first()
+        for statement in FTS_SCHEMA:
+            conn.exec_driver_sql(statement)
+        if not exists:
+            _populate(conn)
+    if not exists:
+        _populate_archives()
+
+
+def rebuild_search_index():
+    """색인 전체 재구축 (보관된 주문 포함)"""
+    with current_engine().begin() as conn:
+        conn.exec_driver_sql(f'DELETE FROM {FTS_TABLE}')
+        _populate(conn)
+    _populate_archives()
+
+
+def index_archived_orders(conn):
+    """ATTACH된 보관 파일의 주문 중 색인에 없는 주문을 색인 (보관 직후 같은 연결에서 호출)"""
+    _populate(conn, ARCHIVE_SCHEMA)
+
+
+def _populate_archives():
+    if not archive_enabled():
+        return
+    for month in archive_months():
+        with attached(month) as conn:
+            index_archived_orders(conn)
+            conn.commit()
+
+
+def _populate(conn, schema='main'):
+    """schema의 주문 중 색인에 없는 주문을 색인"""
+    conn.exec_driver_sql(f"""
+        INSERT INTO {FTS_TABLE}(rowid, customer_name, delivery_location, order_request, special_requests)
+        SELECT o.id, o.customer_name, o.delivery_location, coalesce(o.order_request, ''),
+               coalesce(i.special_requests, '')
+        FROM {schema}.cafe_order AS o
+        LEFT JOIN (
+            SELECT order_id, group_concat(special_request, ' ') AS special_requests
+            FROM {schema}.cafe_order_item
+            GROUP BY order_id
+        ) AS i ON i.order_id = o.id
+        WHERE o.id NOT IN (SELECT rowid FROM main.{FTS_TABLE})
+    """)
+
+
+def build_match_query(keyword):
+    """검색어를 FTS5 MATCH 식으로 변환 (단어별 접두어 검색, 모든 단어 포함)"""
+    terms = []
+    for term in keyword.split():
+        term = term.replace('"', '')
+        if term:
+            terms.append(f'"{term}"*')
+    return ' '.join(terms)
+
+
+def search_orders(keyword, page=1, per_page=20):
+    """관련도 순 주문 검색 결과 (페이지 단위)"""
+    match = build_match_query(keyword or '')
+    if not match or not search_enabled():
+        return {'orders': [], 'total': 0, 'page': 1, 'pages': 0}
+
+    page = max(page, 1)
+    total = db.session.execute(
+        text(f'SELECT count(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match'),
+        {'match': match}
+    ).scalar()
+
+    order_ids = db.session.execute(
+        text(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match '
+             f'ORDER BY rank LIMIT :limit OFFSET :offset'),
+        {'match': match, 'limit': per_page, 'offset': (page - 1) * per_page}
+    ).scalars().all()
+
+    orders_by_id = {
+        order.id: order
+        for order in Order.query.options(selectinload(Order.order_items).joinedload(OrderItem.menu))
+                                .filter(Order.id.in_(order_ids))
+    }
+    archived_ids = [order_id for order_id in order_ids if order_id not in orders_by_id]
+    if archived_ids:
+        orders_by_id.update((order.id, order) for order in get_archived_orders(order_ids=archived_ids))
+
+    return {
+        'orders': [orders_by_id[order_id] for order_id in order_ids if order_id in orders_by_id],
+        'total': total,
+        'page': page,
+        'pages': math.ceil(total / per_page),
+    }
+
+
+def init_search(app):
+    """전문 검색 색인 생성 및 재구축 명령 등록"""
+    with app.app_context():
+        for store_id in app.config['STORES']:
+            with use_store(store_id):
+                if search_enabled():
+                    create_search_index()
+
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index_command():
+        """주문 검색 색인 재구축 (모든 매장)"""
+        for store_id in app.config['STORES']:
+            with use_store(store_id):
+                if search_enabled():
+                    rebuild_search_index()
+        print('주문 검색 색인이 재구축되었습니다.')
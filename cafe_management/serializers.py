@@ -0,0 +1,151 @@
+"""주문/메뉴 JSON 직렬화
+
+ORM 객체와 to_dict() 대신 필요한 컬럼만 Core 쿼리로 조회해 dict를 만들고, orjson이 설치되어 있으면
+JSON 응답 생성에 사용합니다. 시각은 필드별 strftime 없이 ISO 8601 문자열(iso) 또는 epoch 초(epoch)로 내보냅니다.
+fields=id,status,items.menu_name 처럼 필요한 필드만 지정할 수 있습니다 (items는 주문 항목 전체).
+"""
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import select
+from datetime import date, datetime
+
+from models import db, Menu, Order, OrderItem
+
+try:
+    import orjson
+except ImportError:  # orjson 미설치 시 표준 json 사용
+    orjson = None
+
+TIMESTAMP_FORMATS = ('iso', 'epoch')
+
+_orders = Order.__table__
+_items = OrderItem.__table__
+_menus = Menu.__table__
+
+ORDER_FIELDS = {name: _orders.c[name] for name in (
+    'id', 'order_date', 'status', 'total_amount', 'customer_name', 'delivery_location',
+    'delivery_time', 'order_request', 'created_at', 'updated_at'
+)}
+
+ITEM_FIELDS = {name: _items.c[name] for name in (
+    'id', 'order_id', 'menu_id', 'quantity', 'subtotal', 'special_request', 'temperature', 'created_at'
+)}
+ITEM_FIELDS['menu_name'] = _menus.c.name
+
+MENU_FIELDS = {name: _menus.c[name] for name in (
+    'id', 'name', 'category', 'price', 'description', 'image', 'temperature_option',
+    'display_order', 'is_soldout', 'created_at', 'updated_at'
+)}
+
+
+def _default(obj):
+    if isinstance(obj, (date, datetime)):
+        return obj.isoformat()
+    return DefaultJSONProvider.default(obj)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """orjson이 있으면 orjson으로 직렬화하는 JSON 제공자 (시각은 ISO 8601)"""
+
+    default = staticmethod(_default)
+    sort_keys = False
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS),
+            mimetype=self.mimetype
+        )
+
+
+def parse_fields(value, allowed):
+    """쉼표로 구분된 필드 목록 중 allowed에 있는 것만 반환 (없거나 모두 잘못되면 전체)"""
+    fields = [name.strip() for name in (value or '').split(',') if name.strip() in allowed]
+    return fields or list(allowed)
+
+
+def _split_order_fields(value):
+    """fields 파라미터를 (주문 필드, 주문 항목 필드)로 분리"""
+    allowed = list(ORDER_FIELDS) + ['items'] + [f'items.{name}' for name in ITEM_FIELDS]
+    fields = parse_fields(value, allowed)
+
+    order_fields = [name for name in fields if name in ORDER_FIELDS]
+    item_fields = [name[len('items.'):] for name in fields if name.startswith('items.')]
+    if 'items' in fields:
+        item_fields = list(ITEM_FIELDS)
+    return order_fields, item_fields
+
+
+def _convert_timestamps(rows, columns, timestamps):
+    """epoch 형식이면 시각 컬럼을 epoch 초로 변환 (iso는 JSON 직렬화 시 그대로 변환됨)"""
+    if timestamps != 'epoch':
+        return
+    names = [name for name in columns if name.endswith(('_at', '_date'))]
+    for row in rows:
+        for name in names:
+            if row.get(name) is not None:
+                row[name] = row[name].timestamp()
+
+
+def order_dicts(order_ids=None, limit=20, fields=None, timestamps='iso'):
+    """주문 dict 목록 (order_ids를 주면 그 순서대로, 아니면 최근 주문 limit건)"""
+    order_fields, item_fields = _split_order_fields(fields)
+
+    columns = order_fields if 'id' in order_fields else ['id'] + order_fields
+    statement = select(*(ORDER_FIELDS[name].label(name) for name in columns))
+    if order_ids is not None:
+        statement = statement.where(_orders.c.id.in_(order_ids))
+    else:
+        statement = statement.order_by(_orders.c.order_date.desc()).limit(limit)
+    rows = [dict(row) for row in db.session.execute(statement).mappings()]
+
+    if order_ids is not None:
+        rows_by_id = {row['id']: row for row in rows}
+        rows = [rows_by_id[order_id] for order_id in order_ids if order_id in rows_by_id]
+    _convert_timestamps(rows, order_fields, timestamps)
+
+    if item_fields:
+        item_columns = item_fields if 'order_id' in item_fields else ['order_id'] + item_fields
+        item_statement = select(*(ITEM_FIELDS[name].label(name) for name in item_columns)) \
+            .select_from(_items.outerjoin(_menus, _items.c.menu_id == _menus.c.id)) \
+            .where(_items.c.order_id.in_([row['id'] for row in rows])) \
+            .order_by(_items.c.id)
+
+        items_by_order = {row['id']: [] for row in rows}
+        items = [dict(item) for item in db.session.execute(item_statement).mappings()]
+        _convert_timestamps(items, item_fields, timestamps)
+        for item in items:
+            order_id = item['order_id'] if 'order_id' in item_fields else item.pop('order_id')
+            items_by_order[order_id].append(item)
+        for row in rows:
+            row['items'] = items_by_order[row['id']]
+
+    if 'id' not in order_fields:
+        for row in rows:
+            del row['id']
+    return rows
+
+
+def menu_dicts(fields=None, timestamps='iso', category=None):
+    """메뉴 dict 목록 (표시 순서대로)"""
+    columns = parse_fields(fields, MENU_FIELDS)
+    statement = select(*(MENU_FIELDS[name].label(name) for name in columns)) \
+        .order_by(_menus.c.display_order.asc(), _menus.c.id.asc())
+    if category:
+        statement = statement.where(_menus.c.category == category)
+
+    rows = [dict(row) for row in db.session.execute(statement).mappings()]
+    _convert_timestamps(rows, columns, timestamps)
+    return rows
+
+
+def init_serializers(app):
+    """JSON 응답 직렬화를 FastJSONProvider로 교체"""
+    app.json_provider_class = FastJSONProvider
+    app.json = FastJSONProvider(app)
@@ -255,11 +255,15 @@ const Cart = {
     
     // 장바구니 카운터 업데이트
     updateCounter: function(count) {
-        $('.cart-counter').text(count);
+        $('.cart-counter').each(function() {
+            $(this).text(count + ($(this).data('suffix') || ''));
+        });
         if (count > 0) {
             $('.cart-counter').show();
+            $('.cart-empty').hide();
         } else {
             $('.cart-counter').hide();
+            $('.cart-empty').show();
         }
     },
     
@@ -0,0 +1,150 @@
+// 사용자 화면 오프라인 지원
+// 서비스 워커 등록, 장바구니 수량 표시, 연결이 끊긴 동안의 장바구니 추가 보관 및 전송
+
+const CafePWA = (function() {
+    const QUEUE_KEY = 'cafeCartQueue';
+    let options = {};
+    let syncing = false;
+
+    // 쿠키 값 읽기
+    function readCookie(name) {
+        const match = document.cookie.match(new RegExp('(?:^|; )' + name + '=([^;]*)'));
+        return match ? decodeURIComponent(match[1]) : null;
+    }
+
+    // 전송 대기 중인 장바구니 추가 목록
+    function loadQueue() {
+        try {
+            return JSON.parse(localStorage.getItem(QUEUE_KEY)) || [];
+        } catch (e) {
+            return [];
+        }
+    }
+
+    function saveQueue(queue) {
+        localStorage.setItem(QUEUE_KEY, JSON.stringify(queue));
+        updatePending(queue);
+    }
+
+    // 전송 대기 수량 표시
+    function updatePending(queue) {
+        const quantity = queue.reduce(function(sum, action) {
+            return sum + action.quantity;
+        }, 0);
+        $('.cart-pending').text(quantity + '개 상품이 연결되면 추가됩니다').toggle(quantity > 0);
+    }
+
+    // 캐시된 화면에도 최신 장바구니 수량 표시 (서버가 응답마다 갱신하는 쿠키 사용)
+    function updateCartCount() {
+        const count = parseInt(readCookie('cart_count'), 10);
+        if (!isNaN(count)) {
+            Cart.updateCounter(count);
+        }
+    }
+
+    // 연결 상태 안내
+    function updateOnlineStatus() {
+        $('#offlineNotice').remove();
+        if (!navigator.onLine) {
+            $('main').prepend(`
+                <div class="alert alert-warning" id="offlineNotice" role="alert">
+                    <i class="fas fa-wifi"></i> 오프라인 상태입니다. 마지막으로 받은 메뉴를 표시하며, 장바구니 추가는 연결되면 전송됩니다.
+                </div>
+            `);
+        }
+    }
+
+    // 장바구니 추가 보관 (폼 직렬화 문자열)
+    function queueCartAction(formData) {
+        const queue = loadQueue();
+        const quantity = parseInt(new URLSearchParams(formData).get('quantity'), 10) || 1;
+        queue.push({data: formData, quantity: quantity, queuedAt: Date.now()});
+        saveQueue(queue);
+    }
+
+    // 보관된 장바구니 추가를 순서대로 전송 (연결이 끊기거나 서버가 바쁘면 다음에 다시 시도)
+    async function syncCartQueue() {
+        let queue = loadQueue();
+        if (syncing || !navigator.onLine || queue.length === 0) {
+            return;
+        }
+
+        syncing = true;
+        let added = 0;
+        const rejected = [];
+        try {
+            while (queue.length > 0) {
+                let response;
+                try {
+                    response = await fetch(options.addToCartUrl, {
+                        method: 'POST',
+                        body: new URLSearchParams(queue[0].data),
+                        headers: {'Accept': 'application/json'},
+                        credentials: 'same-origin'
+                    });
+                } catch (e) {
+                    break;
+                }
+                if (response.status === 429 || response.status >= 500) {
+                    break;
+                }
+
+                const result = await response.json().catch(function() {
+                    return {success: false, message: '장바구니 추가 중 오류가 발생했습니다.'};
+                });
+                queue = queue.slice(1);
+                saveQueue(queue);
+
+                if (result.success) {
+                    added += 1;
+                    Cart.updateCounter(result.cart_count);
+                } else {
+                    rejected.push(result.message);
+                }
+            }
+        } finally {
+            syncing = false;
+        }
+
+        if (added > 0) {
+            showAlert('success', `연결이 복구되어 보관된 ${added}건을 장바구니에 추가했습니다.`);
+            if (options.reloadAfterSync) {
+                location.reload();
+            }
+        }
+        rejected.forEach(function(message) {
+            showAlert('error', message);
+        });
+    }
+
+    function init(config) {
+        options = config;
+
+        if ('serviceWorker' in navigator) {
+            navigator.serviceWorker.register(options.serviceWorker, {scope: options.scope}).catch(function(error) {
+                console.warn('서비스 워커 등록 실패:', error);
+            });
+        }
+
+        $(document).ready(function() {
+            updateCartCount();
+            updatePending(loadQueue());
+            updateOnlineStatus();
+            syncCartQueue();
+        });
+
+        window.addEventListener('online', function() {
+            updateOnlineStatus();
+            syncCartQueue();
+        });
+        window.addEventListener('offline', updateOnlineStatus);
+    }
+
+    return {
+        init: init,
+        queueCartAction: queueCartAction,
+        syncCartQueue: syncCartQueue
+    };
+})();
+
+window.CafePWA = CafePWA;
@@ -0,0 +1,150 @@
+"""매장별 데이터베이스 라우팅 및 읽기/쓰기 분리
+
+config.STORES의 각 매장은 자신의 데이터베이스(SQLALCHEMY_BINDS의 store_<id>)와 연결 풀을 가지며,
+요청 중에는 세션에 저장된 매장의 데이터베이스로 모든 쿼리가 전달됩니다.
+기본 매장(DEFAULT_STORE)은 SQLALCHEMY_DATABASE_URI를 사용합니다.
+
+READ_WRITE_SPLIT이 켜져 있으면 매장마다 읽기 전용 엔진(SQLite는 WAL 모드의 query_only 연결,
+그 외에는 READ_REPLICAS의 URI)을 따로 두고, @read_only 뷰와 reading() 블록의 쿼리는 이 엔진으로 보내
+매출 조회/내보내기 같은 긴 읽기가 주문 쓰기를 막지 않도록 합니다.
+"""
+from flask import current_app, g, session, has_app_context, has_request_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import wraps
+
+
+def _db():
+    return current_app.extensions['sqlalchemy']
+
+
+def store_bind_key(store_id):
+    """매장의 bind 키 (기본 매장 또는 별도 데이터베이스가 없으면 None)"""
+    store = current_app.config['STORES'].get(store_id, {})
+    if store_id == current_app.config['DEFAULT_STORE'] or not store.get('database'):
+        return None
+    return f'store_{store_id}'
+
+
+def current_store():
+    """현재 매장 ID (use_store > 세션 선택 > 기본 매장 순)"""
+    store_id = g.get('store')
+    if store_id is None and has_request_context():
+        store_id = session.get('store')
+    if store_id not in current_app.config['STORES']:
+        store_id = current_app.config['DEFAULT_STORE']
+    return store_id
+
+
+def current_engine():
+    """현재 매장의 엔진 (읽기 전용 구간에서는 읽기 엔진)"""
+    store_id = current_store()
+    if g.get('read_only'):
+        read_engine = current_app.extensions['read_engines'].get(store_id)
+        if read_engine is not None:
+            return read_engine
+    return _db().engines[store_bind_key(store_id)]
+
+
+class StoreRoutingSession(Session):
+    """현재 매장의 데이터베이스로 쿼리를 보내는 세션"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_app_context():
+            return current_engine()
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@contextmanager
+def use_store(store_id):
+    """블록 안의 쿼리를 지정한 매장으로 보냄
+
+    다른 매장의 객체가 identity map에 섞이지 않도록 전환 전후에 세션을 닫으므로
+    커밋하지 않은 변경사항은 사라집니다.
+    """
+    db = _db()
+    previous = g.get('store')
+    db.session.close()
+    g.store = store_id
+    try:
+        yield
+    finally:
+        db.session.close()
+        g.store = previous
+
+
+def for_each_store(func, *args, **kwargs):
+    """모든 매장에서 func를 병렬 실행하고 {매장 ID: 결과} 반환"""
+    app = current_app._get_current_object()
+    reading_flag = g.get('read_only', False)
+
+    def run(store_id):
+        with app.app_context():
+            g.store = store_id
+            g.read_only = reading_flag
+            return func(*args, **kwargs)
+
+    store_ids = list(app.config['STORES'])
+    with ThreadPoolExecutor(max_workers=len(store_ids)) as executor:
+        return dict(zip(store_ids, executor.map(run, store_ids)))
+
+
+@contextmanager
+def reading():
+    """블록 안의 쿼리를 읽기 전용 엔진으로 보냄"""
+    previous = g.get('read_only', False)
+    g.read_only = True
+    try:
+        yield
+    finally:
+        g.read_only = previous
+
+
+def read_only(f):
+    """조회 전용 뷰 데코레이터 (쿼리를 읽기 전용 엔진으로 보냄)"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        with reading():
+            return f(*args, **kwargs)
+    return decorated_function
+
+
+def _set_query_only(dbapi_connection, connection_record):
+    """읽기 엔진 연결은 쓰기를 거부하도록 설정"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA query_only = ON')
+    cursor.close()
+
+
+def _create_read_engine(app, store_id, engine):
+    """매장의 읽기 전용 엔진 생성 (만들 수 없으면 None)"""
+    replica_uri = app.config['READ_REPLICAS'].get(store_id)
+    if replica_uri:
+        return create_engine(replica_uri)
+
+    if engine.dialect.name != 'sqlite' or engine.url.database in (None, '', ':memory:'):
+        return None
+
+    # WAL 모드에서는 읽기 트랜잭션이 쓰기를 막지 않음 (설정은 파일에 유지됨)
+    with engine.connect() as conn:
+        conn.exec_driver_sql('PRAGMA journal_mode = WAL')
+
+    read_engine = create_engine(engine.url, pool_size=app.config['READ_POOL_SIZE'])
+    event.listen(read_engine, 'connect', _set_query_only)
+    return read_engine
+
+
+def init_read_engines(app):
+    """매장별 읽기 전용 엔진 생성"""
+    app.extensions['read_engines'] = {}
+    if not app.config['READ_WRITE_SPLIT']:
+        return
+
+    with app.app_context():
+        for store_id in app.config['STORES']:
+            engine = _db().engines[store_bind_key(store_id)]
+            read_engine = _create_read_engine(app, store_id, engine)
+            if read_engine is not None:
+                app.extensions['read_engines'][store_id] = read_engine
@@ -0,0 +1,143 @@
+from jinja2 import nodes, FileSystemBytecodeCache
+from jinja2.ext import Extension
+from markupsafe import Markup
+from cachelib import SimpleCache
+from sqlalchemy import func, text
+import os
+
+from models import db, Menu, Order
+from stores import current_engine, use_store
+
+
+class FragmentCacheExtension(Extension):
+    """템플릿 조각 캐시 태그 ({% cache 'name', key... %} ... {% endcache %})"""
+    tags = {'cache'}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=None)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+
+        # 캐시 키 구성 요소 (쉼표로 구분된 표현식)
+        args = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            args.append(parser.parse_expression())
+
+        body = parser.parse_statements(['name:endcache'], drop_needle=True)
+        call = self.call_method('_cache_support', [nodes.List(args)])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _cache_support(self, key_parts, caller):
+        """캐시된 조각 반환, 없으면 렌더링 후 저장"""
+        cache = self.environment.fragment_cache
+        if cache is None:
+            return caller()
+
+        key = 'fragment:' + '|'.join(str(part) for part in key_parts)
+        rv = cache.get(key)
+        if rv is None:
+            rv = caller()
+            cache.set(key, str(rv))
+        return Markup(rv)
+
+
+VERSION_TABLE = 'cafe_data_version'
+
+# 테이블: 변경 시 올라가는 버전 이름
+_VERSIONED_TABLES = {
+    'cafe_menu': 'menu',
+    'cafe_order': 'order',
+    'cafe_order_item': 'order',
+}
+
+VERSION_SCHEMA = [
+    f"""CREATE TABLE IF NOT EXISTS {VERSION_TABLE} (
+        name VARCHAR(20) PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0
+    )""",
+    f"INSERT OR IGNORE INTO {VERSION_TABLE} (name) VALUES ('menu'), ('order')",
+] + [
+    f"""CREATE TRIGGER IF NOT EXISTS {table}_version_{suffix} AFTER {operation} ON {table} BEGIN
+        UPDATE {VERSION_TABLE} SET version = version + 1 WHERE name = '{name}';
+    END"""
+    for table, name in _VERSIONED_TABLES.items()
+    for operation, suffix in (('INSERT', 'ai'), ('UPDATE', 'au'), ('DELETE', 'ad'))
+]
+
+
+def _versions_enabled():
+    """SQLite에서만 트리거로 버전 관리"""
+    return current_engine().dialect.name == 'sqlite'
+
+
+def create_version_table():
+    """버전 테이블과 트리거 생성"""
+    with current_engine().begin() as conn:
+        for statement in VERSION_SCHEMA:
+            conn.exec_driver_sql(statement)
+
+
+def data_version(name):
+    """현재 매장의 데이터 버전
+
+    SQLite는 메뉴/주문 테이블의 트리거가 올리는 버전 행을 기본 키로 읽으므로, 다른 워커 프로세스나
+    일괄 변경으로 바뀐 데이터도 반영되고 화면마다 테이블을 훑지 않습니다.
+    다른 데이터베이스는 행 수와 마지막 수정 시각으로 만듭니다.
+    """
+    if _versions_enabled():
+        return db.session.execute(
+            text(f'SELECT version FROM {VERSION_TABLE} WHERE name = :name'), {'name': name}
+        ).scalar()
+
+    model = Menu if name == 'menu' else Order
+    count, last_id, last_updated = db.session.query(
+        func.count(model.id), func.max(model.id), func.max(model.updated_at)
+    ).one()
+    return f'{count}:{last_id}:{last_updated}'
+
+
+def menu_version():
+    """메뉴 데이터 버전"""
+    return data_version('menu')
+
+
+def order_version():
+    """주문 데이터 버전"""
+    return data_version('order')
+
+
+def clear_fragment_cache(app):
+    """저장된 템플릿 조각 전체 삭제"""
+    cache = app.jinja_env.fragment_cache
+    if cache is not None:
+        cache.clear()
+
+
+def init_template_cache(app):
+    """Jinja 조각 캐시 및 바이트코드 캐시 설정"""
+    options = dict(app.jinja_options)
+    options['extensions'] = list(options.get('extensions', [])) + [FragmentCacheExtension]
+
+    bytecode_dir = app.config.get('TEMPLATE_BYTECODE_CACHE_DIR')
+    if bytecode_dir:
+        os.makedirs(bytecode_dir, exist_ok=True)
+        options['bytecode_cache'] = FileSystemBytecodeCache(bytecode_dir)
+
+    # jinja_env는 처음 접근할 때 생성되므로 그 전에 옵션을 지정해야 함
+    app.jinja_options = options
+
+    if app.config.get('FRAGMENT_CACHE_ENABLED', True):
+        app.jinja_env.fragment_cache = SimpleCache(
+            threshold=app.config.get('FRAGMENT_CACHE_THRESHOLD', 500),
+            default_timeout=app.config.get('FRAGMENT_CACHE_TIMEOUT', 0)
+        )
+
+    with app.app_context():
+        for store_id in app.config['STORES']:
+            with use_store(store_id):
+                if _versions_enabled():
+                    create_version_table()
+
+    app.jinja_env.globals.update(menu_version=menu_version, order_version=order_version)
@@ -0,0 +1,214 @@
+// 카페 주문 서비스 워커 (/user/ 범위, pwa.py에서 설정값을 넣어 렌더링)
+// - 화면 셸(CSS/JS/CDN 라이브러리)과 메뉴 이미지는 캐시 우선
+// - 메뉴 화면은 메뉴 JSON 버전만 확인해 바뀌지 않았으면(304) 캐시된 화면 사용, 연결이 없으면 캐시 또는 오프라인 화면
+
+const CACHE_VERSION = {{ cache_version|tojson }};
+const SHELL_CACHE = 'cafe-shell-' + CACHE_VERSION;
+const PAGE_CACHE = 'cafe-pages-' + CACHE_VERSION;
+const IMAGE_CACHE = 'cafe-images';
+
+const SHELL_URLS = {{ shell_urls|tojson }};
+const MENU_URL = {{ menu_url|tojson }};
+const MENU_JSON_URL = {{ menu_json_url|tojson }};
+const OFFLINE_URL = {{ offline_url|tojson }};
+const VERSION_HEADER = {{ version_header|tojson }};
+const STATIC_PREFIX = {{ static_prefix|tojson }};
+const IMAGE_PREFIX = {{ image_prefix|tojson }};
+const ASSET_PREFIX = {{ asset_prefix|tojson }};
+const IMAGE_CACHE_LIMIT = {{ image_cache_limit|tojson }};
+const REVALIDATE_TIMEOUT = {{ revalidate_timeout|tojson }};
+
+const SCOPE_PATH = new URL(self.registration.scope).pathname;
+const CDN_ORIGINS = new Set(SHELL_URLS.map(url => new URL(url, self.location).origin)
+    .filter(origin => origin !== self.location.origin));
+
+self.addEventListener('install', event => {
+    event.waitUntil((async () => {
+        const cache = await caches.open(SHELL_CACHE);
+        // CDN 파일은 CORS 없이(no-cors) 받으므로 하나씩 저장하고 실패해도 설치는 계속
+        await Promise.all(SHELL_URLS.map(async url => {
+            try {
+                const request = new URL(url, self.location).origin === self.location.origin
+                    ? new Request(url) : new Request(url, {mode: 'no-cors'});
+                const response = await fetch(request);
+                if (response.ok || response.type === 'opaque') {
+                    await cache.put(request, response);
+                }
+            } catch (error) {
+                console.warn('캐시 실패:', url, error);
+            }
+        }));
+
+        const pages = await caches.open(PAGE_CACHE);
+        await fetchPage(new Request(MENU_URL), pages).catch(() => null);
+        await self.skipWaiting();
+    })());
+});
+
+self.addEventListener('activate', event => {
+    event.waitUntil((async () => {
+        const current = [SHELL_CACHE, PAGE_CACHE, IMAGE_CACHE];
+        const names = await caches.keys();
+        await Promise.all(names
+            .filter(name => name.startsWith('cafe-') && !current.includes(name))
+            .map(name => caches.delete(name)));
+        await self.clients.claim();
+    })());
+});
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    const url = new URL(request.url);
+
+    if (request.method !== 'GET') {
+        // 주문/장바구니 변경 화면 전송이 실패하면 오프라인 화면 표시 (장바구니 추가 AJAX는 pwa.js가 보관)
+        if (request.mode === 'navigate') {
+            event.respondWith(fetch(request).catch(() => offlineResponse()));
+        }
+        return;
+    }
+
+    if (request.mode === 'navigate') {
+        if (url.pathname === MENU_URL) {
+            event.respondWith(menuPage(event));
+        } else if (url.pathname.startsWith(SCOPE_PATH)) {
+            event.respondWith(networkFirst(request));
+        }
+        return;
+    }
+
+    if (url.origin === self.location.origin) {
+        if (url.pathname.startsWith(IMAGE_PREFIX)) {
+            event.respondWith(cacheImage(request));
+        } else if (url.pathname.startsWith(ASSET_PREFIX)) {
+            event.respondWith(cacheFirst(request));  // 해시 파일명이므로 내용이 바뀌지 않음
+        } else if (url.pathname.startsWith(STATIC_PREFIX)) {
+            event.respondWith(staleWhileRevalidate(request));
+        }
+    } else if (CDN_ORIGINS.has(url.origin)) {
+        event.respondWith(cacheFirst(request));  // 버전이 붙은 주소 (웹폰트 포함)
+    }
+});
+
+// 메뉴 화면: 캐시된 화면의 버전을 메뉴 JSON에 조건부 요청으로 확인
+async function menuPage(event) {
+    const request = event.request;
+    const cache = await caches.open(PAGE_CACHE);
+    const cached = await cache.match(request);
+
+    if (cached && cached.headers.get(VERSION_HEADER)) {
+        try {
+            const response = await withTimeout(fetch(MENU_JSON_URL, {
+                headers: {'If-None-Match': `"${cached.headers.get(VERSION_HEADER)}"`},
+                credentials: 'same-origin'
+            }), REVALIDATE_TIMEOUT);
+            if (response.status === 304) {
+                return cached;
+            }
+            if (response.ok) {
+                event.waitUntil(response.json().then(data => cacheMenuImages(data.menus)).catch(() => null));
+            }
+        } catch (error) {
+            return cached;  // 연결이 없거나 응답이 늦으면 캐시된 화면
+        }
+    }
+
+    try {
+        return await fetchPage(request, cache);
+    } catch (error) {
+        return cached || offlineResponse();
+    }
+}
+
+// 화면을 받아 캐시 (한 번만 보여줄 알림이 있는 화면 등 no-store 응답은 제외)
+async function fetchPage(request, cache) {
+    const response = await fetch(request);
+    const cacheControl = response.headers.get('Cache-Control') || '';
+    if (response.ok && !cacheControl.includes('no-store')) {
+        await cache.put(request, response.clone());
+    }
+    return response;
+}
+
+async function networkFirst(request) {
+    const cache = await caches.open(PAGE_CACHE);
+    try {
+        return await fetchPage(request, cache);
+    } catch (error) {
+        return (await cache.match(request)) || offlineResponse();
+    }
+}
+
+async function cacheFirst(request) {
+    const cache = await caches.open(SHELL_CACHE);
+    const cached = await cache.match(request);
+    if (cached) {
+        return cached;
+    }
+    const response = await fetch(request);
+    if (response.ok || response.type === 'opaque') {
+        await cache.put(request, response.clone());
+    }
+    return response;
+}
+
+async function staleWhileRevalidate(request) {
+    const cache = await caches.open(SHELL_CACHE);
+    const cached = await cache.match(request);
+    const network = fetch(request).then(response => {
+        if (response.ok) {
+            cache.put(request, response.clone());
+        }
+        return response;
+    });
+    if (cached) {
+        network.catch(() => null);
+        return cached;
+    }
+    return network;
+}
+
+async function cacheImage(request) {
+    const cache = await caches.open(IMAGE_CACHE);
+    const cached = await cache.match(request);
+    if (cached) {
+        return cached;
+    }
+    const response = await fetch(request);
+    if (response.ok) {
+        await cache.put(request, response.clone());
+        await trimCache(cache, IMAGE_CACHE_LIMIT);
+    }
+    return response;
+}
+
+// 메뉴가 바뀌면 다른 카테고리의 이미지도 미리 받아 오프라인에서 표시
+async function cacheMenuImages(menus) {
+    const cache = await caches.open(IMAGE_CACHE);
+    const urls = menus.map(menu => menu.image_url).filter(Boolean).slice(0, IMAGE_CACHE_LIMIT);
+    for (const url of urls) {
+        if (!(await cache.match(url))) {
+            await cacheImage(new Request(url)).catch(() => null);
+        }
+    }
+}
+
+// 오래 저장된 항목부터 삭제
+async function trimCache(cache, limit) {
+    const keys = await cache.keys();
+    await Promise.all(keys.slice(0, Math.max(keys.length - limit, 0)).map(key => cache.delete(key)));
+}
+
+async function offlineResponse() {
+    return (await caches.match(OFFLINE_URL)) || new Response('오프라인 상태입니다.', {
+        status: 503,
+        headers: {'Content-Type': 'text/plain; charset=utf-8'}
+    });
+}
+
+function withTimeout(promise, milliseconds) {
+    return new Promise((resolve, reject) => {
+        const timer = setTimeout(() => reject(new Error('timeout')), milliseconds);
+        promise.then(resolve, reject).finally(() => clearTimeout(timer));
+    });
+}